@@ -0,0 +1 @@
+"""Benchmarks for the simulator building blocks; run modules with python -m."""
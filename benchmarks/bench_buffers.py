@@ -0,0 +1,200 @@
+# benchmarks/bench_buffers.py
+"""
+Throughput benchmark for the buffer models, with zero think time.
+
+    python -m benchmarks.bench_buffers -o baseline.json
+    python -m benchmarks.bench_buffers -o bench.json --baseline baseline.json
+
+- Every model in buffers.BUFFER_MODELS is measured, so new buffers are picked up
+- Shapes 1P1C, NP1C, 1PNC and NPNC at several capacities
+- Reports ops/sec, p99 produce→consume handoff latency and process CPU time
+- Writes JSON with machine metadata; with --baseline, exits 1 when any
+  case's ops/sec dropped by more than --tolerance
+- Baselines are per machine: one recorded on a different OS, architecture,
+  processor, CPU count, Python major.minor or GIL setting is refused
+  (exit 2) unless --allow-machine-mismatch is given
+"""
+
+import argparse, json, os, platform, sys, threading, time
+
+from buffers import BUFFER_MODELS, SINGLE_PAIR_MODELS, make_buffer
+from stats import LatencyHistogram
+
+SHAPES = {"1P1C": (1, 1), "NP1C": ("N", 1), "1PNC": (1, "N"), "NPNC": ("N", "N")}
+# machine_info() fields that must match for ops/sec to be comparable; the
+# full platform string (kernel release) and patch version are left out so
+# routine OS/interpreter updates do not orphan a stored baseline
+COMPARABLE = ("system", "machine", "processor", "cpu_count", "python_minor", "gil")
+
+
+def machine_info():
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    return {
+        "platform": platform.platform(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "python_minor": "%d.%d" % sys.version_info[:2],
+        "implementation": platform.python_implementation(),
+        "gil": gil,
+    }
+
+
+def run_case(mode, producers, consumers, capacity, items):
+    """Move `items` items through one buffer; returns (wall_s, cpu_s, handoff histogram)."""
+    buf = make_buffer(mode, capacity)
+    per_producer = [items // producers + (1 if i < items % producers else 0) for i in range(producers)]
+    hists = [LatencyHistogram() for _ in range(consumers)]
+    start = threading.Barrier(producers + consumers + 1)
+
+    def produce(n):
+        start.wait()
+        for _ in range(n):
+            buf.produce(time.monotonic_ns())
+
+    def consume(hist):
+        start.wait()
+        while True:
+            item = buf.consume()
+            if item is None:        # sentinel (or stopped)
+                return
+            hist.record(time.monotonic_ns() - item)
+
+    threads = [threading.Thread(target=produce, args=(n,)) for n in per_producer]
+    threads += [threading.Thread(target=consume, args=(h,)) for h in hists]
+    for t in threads:
+        t.start()
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    start.wait()
+    for t in threads[:producers]:
+        t.join()
+    for _ in range(consumers):
+        buf.produce(None)
+    for t in threads[producers:]:
+        t.join()
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+
+    total = LatencyHistogram()
+    for h in hists:
+        total.merge(h)
+    return wall, cpu, total
+
+
+def case_name(mode, shape, capacity):
+    return f"{mode}/{shape}/cap{capacity}"
+
+
+def run_suite(modes, shapes, capacities, n, items, repeat, on_result=None):
+    results = []
+    for mode in modes:
+        for shape in shapes:
+            p, c = (n if x == "N" else x for x in SHAPES[shape])
+            if mode in SINGLE_PAIR_MODELS and (p, c) != (1, 1):
+                continue
+            for cap in capacities:
+                # best of `repeat` by wall time; p99/cpu are taken from that run
+                best = min((run_case(mode, p, c, cap, items) for _ in range(repeat)), key=lambda r: r[0])
+                wall, cpu, hist = best
+                row = {
+                    "case": case_name(mode, shape, cap),
+                    "mode": mode,
+                    "shape": shape,
+                    "producers": p,
+                    "consumers": c,
+                    "capacity": cap,
+                    "items": items,
+                    "ops_per_s": round(items / wall, 1) if wall > 0 else 0.0,
+                    "p99_handoff_us": round(hist.value_at(99) / 1000.0, 3),
+                    "cpu_s": round(cpu, 4),
+                    "wall_s": round(wall, 4),
+                }
+                results.append(row)
+                if on_result:
+                    on_result(row)
+    return results
+
+
+def machine_mismatch(machine, baseline):
+    """[(field, baseline value, this value)] for COMPARABLE fields that differ."""
+    other = baseline.get("machine", {})
+    return [(k, other.get(k), machine.get(k)) for k in COMPARABLE if other.get(k) != machine.get(k)]
+
+
+def compare(results, baseline, tolerance):
+    """Cases whose ops/sec fell more than `tolerance` (fraction) below the baseline."""
+    base = {r["case"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get(r["case"])
+        if b is None or not b["ops_per_s"]:
+            continue
+        change = r["ops_per_s"] / b["ops_per_s"] - 1.0
+        if change < -tolerance:
+            regressions.append((r["case"], b["ops_per_s"], r["ops_per_s"], change))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_buffers", description="Buffer model throughput benchmark")
+    parser.add_argument("--modes", default=",".join(BUFFER_MODELS), help="comma-separated buffer models")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="comma-separated subset of " + ",".join(SHAPES))
+    parser.add_argument("--capacity", default="1,16,1024", help="comma-separated capacities")
+    parser.add_argument("-n", "--threads", type=int, default=4, help="thread count used for N in the shapes")
+    parser.add_argument("--items", type=int, default=50000, help="items moved per case")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed ops/sec drop vs baseline (fraction)")
+    parser.add_argument("--allow-machine-mismatch", action="store_true",
+                        help="compare against a baseline from a different machine/interpreter (warn only)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    shapes = [s.strip() for s in args.shapes.split(",") if s.strip()]
+    unknown = [m for m in modes if m not in BUFFER_MODELS] + [s for s in shapes if s not in SHAPES]
+    if unknown:
+        raise SystemExit(f"unknown mode(s)/shape(s): {', '.join(unknown)}")
+    capacities = [int(c) for c in args.capacity.split(",") if c.strip()]
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatch = machine_mismatch(machine_info(), baseline)
+        for field, old, new in mismatch:
+            sys.stderr.write(f"MACHINE MISMATCH {field}: baseline {old!r}, this run {new!r}\n")
+        if mismatch and not args.allow_machine_mismatch:
+            sys.stderr.write(f"refusing to compare against {args.baseline}; record a baseline on this machine"
+                             " or pass --allow-machine-mismatch\n")
+            return 2
+
+    def progress(row):
+        sys.stderr.write(f"{row['case']:<28} {row['ops_per_s']:>12} ops/s  p99 {row['p99_handoff_us']} us  cpu {row['cpu_s']} s\n")
+
+    results = run_suite(modes, shapes, capacities, args.threads, args.items, max(1, args.repeat), progress)
+    report = {"machine": machine_info(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for case, old, new, change in regressions:
+            sys.stderr.write(f"REGRESSION {case}: {old} -> {new} ops/s ({change:+.1%})\n")
+        if regressions:
+            return 1
+        sys.stderr.write(f"no regressions beyond {args.tolerance:.0%} vs {args.baseline}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
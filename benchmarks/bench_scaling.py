@@ -0,0 +1,192 @@
+# benchmarks/bench_scaling.py
+"""
+Thread-scaling benchmark for Monitor/Semaphore, for GIL vs free-threaded builds.
+
+    python -m benchmarks.bench_scaling -o scaling.json
+    python -m benchmarks.bench_scaling --python python3.13 --python python3.13t -o scaling.json
+    python -m benchmarks.bench_scaling --python "python3.13t -X gil=1" --python "python3.13t -X gil=0"
+
+- N producers + N consumers for each N in --threads, moving a fixed number
+  of items, each costing --work units of pure-Python work on both sides
+- speedup = ops/sec at N / ops/sec at the smallest N, per interpreter and mode
+- With --python, every interpreter runs the suite in a subprocess and the
+  reports are merged, then a table of speedup per thread count is printed
+- vs_first = ops/sec / the first --python's ops/sec at the same mode and N,
+  e.g. how much the free-threaded build gains over the GIL build
+"""
+
+import argparse, json, os, shlex, subprocess, sys, threading, time
+
+from buffers import make_buffer
+from benchmarks.bench_buffers import machine_info
+
+MODES = ("Monitor", "Semaphore")
+
+
+def spin(work):
+    x = 0
+    for i in range(work):
+        x += i * i
+    return x
+
+
+def run_case(mode, threads, capacity, items, work):
+    """`threads` producers and consumers move `items` items; returns (wall_s, cpu_s)."""
+    buf = make_buffer(mode, capacity)
+    per_producer = [items // threads + (1 if i < items % threads else 0) for i in range(threads)]
+    start = threading.Barrier(2 * threads + 1)
+
+    def produce(n):
+        start.wait()
+        for i in range(n):
+            spin(work)
+            buf.produce(i)
+
+    def consume():
+        start.wait()
+        while buf.consume() is not None:
+            spin(work)
+
+    workers = [threading.Thread(target=produce, args=(n,)) for n in per_producer]
+    workers += [threading.Thread(target=consume) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    start.wait()
+    for t in workers[:threads]:
+        t.join()
+    for _ in range(threads):
+        buf.produce(None)       # one sentinel per consumer
+    for t in workers[threads:]:
+        t.join()
+    return time.perf_counter() - t0, time.process_time() - cpu0
+
+
+def run_suite(modes, thread_counts, capacity, items, work, repeat, on_result=None):
+    results = []
+    for mode in modes:
+        base = None
+        for n in thread_counts:
+            wall, cpu = min((run_case(mode, n, capacity, items, work) for _ in range(repeat)), key=lambda r: r[0])
+            ops = items / wall if wall > 0 else 0.0
+            if base is None:
+                base = ops
+            row = {
+                "mode": mode,
+                "threads": n,
+                "items": items,
+                "work": work,
+                "ops_per_s": round(ops, 1),
+                "speedup": round(ops / base, 3) if base else 0.0,
+                "cpu_s": round(cpu, 4),
+                "wall_s": round(wall, 4),
+            }
+            results.append(row)
+            if on_result:
+                on_result(row)
+    return results
+
+
+def label_of(report):
+    machine = report["machine"]
+    gil = "GIL" if machine["gil"] else "no-GIL"
+    if "python" in report:
+        return f"{report['python']} ({gil})"
+    return f"{machine['implementation']} {machine['python']} {gil}"
+
+
+def run_interpreter(python, argv):
+    """Run this benchmark under another interpreter; returns its report."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cmd = shlex.split(python) + ["-m", "benchmarks.bench_scaling"] + argv
+    out = subprocess.run(cmd, cwd=root, check=True, stdout=subprocess.PIPE, text=True).stdout
+    report = json.loads(out)
+    report["python"] = python
+    return report
+
+
+def add_cross_ratios(reports):
+    """Set vs_first on every row: its ops/sec over the first report's at the same mode and N."""
+    first = {(x["mode"], x["threads"]): x["ops_per_s"] for x in reports[0]["results"]}
+    for r in reports:
+        for x in r["results"]:
+            base = first.get((x["mode"], x["threads"]))
+            x["vs_first"] = round(x["ops_per_s"] / base, 3) if base else None
+
+
+def speedup_table(reports):
+    """Rows of threads x (interpreter, mode) speedups, as text.
+
+    With several interpreters, each one after the first also gets a column
+    of its ops/sec relative to the first at the same thread count.
+    """
+    cols = [(label_of(r), mode, "speedup") for r in reports for mode in dict.fromkeys(x["mode"] for x in r["results"])]
+    cols += [(label_of(r), mode, "vs_first") for r in reports[1:] for mode in dict.fromkeys(x["mode"] for x in r["results"])]
+    cells = {}
+    for r in reports:
+        lab = label_of(r)
+        for x in r["results"]:
+            for key in ("speedup", "vs_first"):
+                if x.get(key) is not None:
+                    cells[(x["threads"], lab, x["mode"], key)] = x[key]
+    heads = [f"{mode} [{lab}]" if key == "speedup" else f"{mode} [{lab} / {label_of(reports[0])}]"
+             for lab, mode, key in cols]
+    lines = ["threads  " + "  ".join(heads)]
+    for n in sorted({k[0] for k in cells}):
+        row = "  ".join(f"{cells.get((n,) + col, float('nan')):.2f}x".rjust(len(h)) for col, h in zip(cols, heads))
+        lines.append(f"{n:>7}  {row}")
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_scaling", description="Monitor/Semaphore thread-scaling benchmark")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated buffer models")
+    parser.add_argument("--threads", default="1,2,4,8", help="comma-separated producer (= consumer) counts")
+    parser.add_argument("--capacity", type=int, default=64)
+    parser.add_argument("--items", type=int, default=20000, help="items moved per case (fixed across thread counts)")
+    parser.add_argument("--work", type=int, default=200, help="loop iterations of Python work per item on each side")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument("--python", action="append", metavar="CMD",
+                        help="interpreter command to run the suite under (repeatable), e.g. 'python3.13t -X gil=0'")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        raise SystemExit(f"unknown mode(s): {', '.join(unknown)}")
+    thread_counts = sorted({int(n) for n in args.threads.split(",") if n.strip()})
+
+    if args.python:
+        forwarded = ["--modes", ",".join(modes), "--threads", ",".join(map(str, thread_counts)),
+                     "--capacity", str(args.capacity), "--items", str(args.items),
+                     "--work", str(args.work), "--repeat", str(args.repeat)]
+        reports = []
+        for python in args.python:
+            sys.stderr.write(f"running under {python} ...\n")
+            reports.append(run_interpreter(python, forwarded))
+        add_cross_ratios(reports)
+        report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "relative_to": args.python[0], "runs": reports}
+    else:
+        def progress(row):
+            sys.stderr.write(f"{row['mode']:<10} {row['threads']:>3}+{row['threads']:<3} {row['ops_per_s']:>12} ops/s  x{row['speedup']}  cpu {row['cpu_s']} s\n")
+
+        results = run_suite(modes, thread_counts, args.capacity, args.items, args.work, max(1, args.repeat), progress)
+        report = {"machine": machine_info(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+        reports = [report]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    sys.stderr.write(speedup_table(reports) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
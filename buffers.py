@@ -0,0 +1,643 @@
+# buffers.py
+"""
+Bounded buffer models used by the simulator.
+- RingBuffer: fixed-capacity storage shared by all models
+- MonitorBuffer: lock + condition variables
+- SemaphoreBuffer: empty/full/mutex counting semaphores
+- SPSCBuffer: single-producer/single-consumer ring, locks only to block
+- ShardedBuffer: capacity split over K locked lanes with home lanes + stealing
+- WorkStealingBuffer: one deque per consumer, idle consumers steal from others
+
+Every model's produce_many/consume_many also returns the occupancy it left
+behind, read under the same lock hold where there is one; len() is a
+lock-free snapshot meant for display.
+"""
+
+import itertools, os, sys, threading
+from collections import deque
+
+from instrument import InstrumentedLock, InstrumentedCondition, InstrumentedSemaphore
+
+# True when a GIL serializes bytecode (decided at startup; a free-threaded
+# build can turn the GIL on later but never off, so False stays safe)
+GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+def acquire_many(sem, max_n, stopped, timeout=None):
+    """Block for one permit of `sem`, then grab whatever extra permits are free (up to max_n).
+
+    `stopped` is a callable checked after the blocking acquire and again
+    after the grab. Returns the number of permits held, 0 on timeout or
+    when the buffer is stopped. Works with threading, instrumented and
+    multiprocessing semaphores (positional acquire args, single releases).
+    """
+    if not sem.acquire(True, timeout):
+        return 0
+    if stopped():
+        sem.release()
+        return 0
+    n = 1
+    while n < max_n and sem.acquire(False):
+        n += 1
+    if stopped():
+        # stop() landed mid-grab: one of the permits may be its wake-up
+        # permit rather than a real slot/item, so hand them all back.
+        for _ in range(n):
+            sem.release()
+        return 0
+    return n
+
+# -------------------------
+# Synchronization Models
+# -------------------------
+class RingBuffer:
+    """Fixed-capacity FIFO storage shared by the buffer models.
+
+    All `capacity` slots are allocated up front and reused through head/tail
+    indices, so append, popleft and len() are O(1) and never reallocate.
+    The ring itself is not thread-safe; callers hold their own lock/mutex.
+    """
+    __slots__ = ("capacity", "slots", "head", "tail", "size")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, item):
+        if self.size == self.capacity:
+            raise IndexError("append to a full RingBuffer")
+        self.slots[self.tail] = item
+        self.tail += 1
+        if self.tail == self.capacity:
+            self.tail = 0
+        self.size += 1
+
+    def popleft(self):
+        if self.size == 0:
+            raise IndexError("pop from an empty RingBuffer")
+        item = self.slots[self.head]
+        self.slots[self.head] = None
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        self.size -= 1
+        return item
+
+class MonitorBuffer:
+    """Bounded buffer implemented using monitor-style locking and conditions.
+
+    Producers block when the buffer is full, and consumers block when it is empty.
+    This models the classic Producer–Consumer problem using monitors (thread-safe).
+    Pass a LockMetrics as `metrics` to record contention on lock/not_full/not_empty.
+    """
+    def __init__(self, capacity, metrics=None):
+        self.capacity = capacity
+        self.q = RingBuffer(capacity)
+        self.stopped = False
+        if metrics is None:
+            self.lock = threading.Lock()
+            self.not_full = threading.Condition(self.lock)
+            self.not_empty = threading.Condition(self.lock)
+        else:
+            self.lock = InstrumentedLock("lock", metrics)
+            self.not_full = InstrumentedCondition(self.lock, "not_full", metrics)
+            self.not_empty = InstrumentedCondition(self.lock, "not_empty", metrics)
+
+    def __len__(self):
+        # lock-free snapshot for display: the count may be stale, never out of range
+        return max(0, min(self.capacity, len(self.q)))
+
+    def has_room(self):
+        return len(self.q) < self.capacity or self.stopped
+
+    def has_item(self):
+        return len(self.q) > 0 or self.stopped
+
+    def produce(self, item):
+        with self.lock:
+            self.not_full.wait_for(self.has_room)
+            if self.stopped: return False
+            self.q.append(item)
+            self.not_empty.notify()
+            return True
+
+    def consume(self):
+        with self.lock:
+            self.not_empty.wait_for(self.has_item)
+            if len(self.q) == 0: return None
+            item = self.q.popleft()
+            self.not_full.notify()
+            return item
+
+    def produce_many(self, items):
+        """Move as many of `items` as currently fit under one lock hold.
+
+        Blocks until at least one slot is free; returns (moved, occupancy),
+        with moved 0 once the buffer is stopped.
+        """
+        with self.lock:
+            self.not_full.wait_for(self.has_room)
+            if self.stopped: return 0, len(self.q)
+            n = min(len(items), self.capacity - len(self.q))
+            for i in range(n):
+                self.q.append(items[i])
+            self.not_empty.notify(n)
+            return n, len(self.q)
+
+    def consume_many(self, max_n, timeout=None):
+        """Take up to `max_n` items under one lock hold.
+
+        Blocks until at least one item is available, `timeout` expires or
+        the buffer is stopped; returns (items, occupancy) where items is a
+        possibly empty list.
+        """
+        with self.lock:
+            self.not_empty.wait_for(self.has_item, timeout)
+            if len(self.q) == 0:
+                return [], 0
+            n = min(max_n, len(self.q))
+            items = [self.q.popleft() for _ in range(n)]
+            self.not_full.notify(n)
+            return items, len(self.q)
+
+    def stop(self):
+        # Wake every blocked producer/consumer at once; they see `stopped` and bail out.
+        with self.lock:
+            self.stopped = True
+            self.not_full.notify_all()
+            self.not_empty.notify_all()
+
+class SemaphoreBuffer:
+    """Bounded buffer implemented using counting semaphores.
+
+    Uses:
+    - empty: counts free slots in the buffer
+    - full:  counts filled slots in the buffer
+    - mutex: gives mutual exclusion while accessing the queue
+
+    This shows the Producer–Consumer solution using semaphores.
+    stop() releases one poison permit on empty/full; every waiter that wakes
+    after the stop passes the permit on to the next one and returns.
+    Pass a LockMetrics as `metrics` to record contention on empty/full/mutex.
+    """
+    def __init__(self, capacity, metrics=None):
+        self.capacity = capacity
+        self.q = RingBuffer(capacity)
+        self.stopped = False
+        if metrics is None:
+            self.empty = threading.Semaphore(capacity)
+            self.full = threading.Semaphore(0)
+            self.mutex = threading.Semaphore(1)
+        else:
+            self.empty = InstrumentedSemaphore(capacity, "empty", metrics)
+            self.full = InstrumentedSemaphore(0, "full", metrics)
+            self.mutex = InstrumentedSemaphore(1, "mutex", metrics, track_hold=True)
+
+    def __len__(self):
+        # lock-free snapshot for display; taking the mutex here would double its traffic
+        return max(0, min(self.capacity, len(self.q)))
+
+    def produce(self, item):
+        self.empty.acquire()
+        if self.stopped:
+            self.empty.release()
+            return False
+
+        self.mutex.acquire()
+        self.q.append(item)
+        self.mutex.release()
+        self.full.release()
+        return True
+
+    def consume(self):
+        self.full.acquire()
+        if self.stopped:
+            self.full.release()
+            return None
+
+        self.mutex.acquire()
+        item = None
+        if len(self.q) != 0:
+            item = self.q.popleft()
+        self.mutex.release()
+        self.empty.release()
+        return item
+
+    def _acquire_many(self, sem, max_n, timeout=None):
+        return acquire_many(sem, max_n, lambda: self.stopped, timeout)
+
+    def produce_many(self, items):
+        """Move up to len(items) items with one mutex hold; returns (moved, occupancy)."""
+        n = self._acquire_many(self.empty, len(items))
+        if n == 0:
+            return 0, len(self)
+        self.mutex.acquire()
+        for i in range(n):
+            self.q.append(items[i])
+        depth = len(self.q)
+        self.mutex.release()
+        self.full.release(n)
+        return n, depth
+
+    def consume_many(self, max_n, timeout=None):
+        """Take up to `max_n` items with one mutex hold; returns (items, occupancy)."""
+        n = self._acquire_many(self.full, max_n, timeout)
+        if n == 0:
+            return [], len(self)
+        self.mutex.acquire()
+        items = [self.q.popleft() for _ in range(min(n, len(self.q)))]
+        depth = len(self.q)
+        self.mutex.release()
+        self.empty.release(n)
+        return items, depth
+
+    def stop(self):
+        self.stopped = True
+        self.empty.release()
+        self.full.release()
+
+class SPSCBuffer:
+    """Bounded ring for exactly one producer thread and one consumer thread.
+
+    `tail` is only written by the producer and `head` only by the consumer,
+    so moving items never takes a lock. The lock and conditions are used
+    only to block when the ring is truly full or empty: the blocked side
+    raises its *_waiting flag under the lock and re-checks the indices,
+    and the other side takes the lock to notify only when that flag is set.
+
+    Skipping the lock is a store-index-then-load-flag handshake, which is
+    only safe under sequentially consistent ordering. The GIL provides
+    that. Free-threaded builds make no such guarantee (and this has not
+    been verified on one), so there the flag is always read under the
+    lock, which costs one uncontended lock per call.
+    """
+    def __init__(self, capacity, metrics=None):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.head = 0       # items ever consumed (consumer-owned)
+        self.tail = 0       # items ever produced (producer-owned)
+        self.stopped = False
+        self.producer_waiting = False
+        self.consumer_waiting = False
+        if metrics is None:
+            self.lock = threading.Lock()
+            self.not_full = threading.Condition(self.lock)
+            self.not_empty = threading.Condition(self.lock)
+        else:
+            self.lock = InstrumentedLock("lock", metrics)
+            self.not_full = InstrumentedCondition(self.lock, "not_full", metrics)
+            self.not_empty = InstrumentedCondition(self.lock, "not_empty", metrics)
+
+    def __len__(self):
+        # lock-free snapshot from a third thread: head may move between the reads
+        head = self.head
+        return max(0, min(self.capacity, self.tail - head))
+
+    def has_room(self):
+        return self.tail - self.head < self.capacity or self.stopped
+
+    def has_item(self):
+        return self.tail != self.head or self.stopped
+
+    def produce(self, item):
+        return self.produce_many((item,))[0] == 1
+
+    def consume(self):
+        items, _ = self.consume_many(1)
+        return items[0] if items else None
+
+    def produce_many(self, items):
+        """Copy as many of `items` as fit; blocks only while the ring is full.
+
+        Returns (moved, occupancy).
+        """
+        free = self.capacity - (self.tail - self.head)
+        if free == 0 and not self.stopped:
+            with self.lock:
+                self.producer_waiting = True
+                self.not_full.wait_for(self.has_room)
+                self.producer_waiting = False
+            free = self.capacity - (self.tail - self.head)
+        if self.stopped:
+            return 0, len(self)
+        n = min(free, len(items))
+        tail, cap = self.tail, self.capacity
+        for i in range(n):
+            self.slots[(tail + i) % cap] = items[i]
+        self.tail = tail + n        # publish only after the slots are written
+        if self.consumer_waiting or not GIL_ENABLED:
+            with self.lock:
+                if self.consumer_waiting:
+                    self.not_empty.notify()
+        return n, len(self)
+
+    def consume_many(self, max_n, timeout=None):
+        """Take up to `max_n` items; blocks only while the ring is empty.
+
+        Returns (items, occupancy).
+        """
+        avail = self.tail - self.head
+        if avail == 0:
+            if self.stopped:
+                return [], 0
+            with self.lock:
+                self.consumer_waiting = True
+                self.not_empty.wait_for(self.has_item, timeout)
+                self.consumer_waiting = False
+            avail = self.tail - self.head
+            if avail == 0:
+                return [], 0
+        n = min(max_n, avail)
+        head, cap, slots = self.head, self.capacity, self.slots
+        items = []
+        for i in range(n):
+            j = (head + i) % cap
+            items.append(slots[j])
+            slots[j] = None
+        self.head = head + n
+        if self.producer_waiting or not GIL_ENABLED:
+            with self.lock:
+                if self.producer_waiting:
+                    self.not_full.notify()
+        return items, len(self)
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            self.not_full.notify_all()
+            self.not_empty.notify_all()
+
+class Lane:
+    """One shard of a ShardedBuffer: a ring and the lock that guards it."""
+    __slots__ = ("q", "lock")
+
+    def __init__(self, capacity, lock):
+        self.q = RingBuffer(capacity)
+        self.lock = lock
+
+
+class ShardedBuffer:
+    """Bounded buffer split over K lanes, each with its own lock.
+
+    Every thread gets a home lane (round-robin on first use) and tries it
+    first, then steals from the other lanes in order, so with many threads
+    the lanes spread lock traffic instead of funnelling it through one
+    mutex. Only when every lane is full (or empty) does a thread block, on
+    a shared slow-path condition that the other side notifies only while
+    someone is asleep on it; waiting on the whole buffer rather than the
+    home lane means an item in any lane wakes an idle consumer.
+    len() is the sum of the lane occupancies.
+    """
+    MAX_LANES = 8
+
+    def __init__(self, capacity, metrics=None, lanes=None):
+        if lanes is None:
+            lanes = min(self.MAX_LANES, max(2, os.cpu_count() or 2))
+        lanes = max(1, min(lanes, capacity))
+        self.capacity = capacity
+        self.stopped = False
+        self.lanes = []
+        for i in range(lanes):
+            cap = capacity // lanes + (1 if i < capacity % lanes else 0)
+            lock = threading.Lock() if metrics is None else InstrumentedLock(f"lane{i}", metrics)
+            self.lanes.append(Lane(cap, lock))
+        if metrics is None:
+            self.idle = threading.Lock()
+            self.not_full = threading.Condition(self.idle)
+            self.not_empty = threading.Condition(self.idle)
+        else:
+            self.idle = InstrumentedLock("idle", metrics)
+            self.not_full = InstrumentedCondition(self.idle, "not_full", metrics)
+            self.not_empty = InstrumentedCondition(self.idle, "not_empty", metrics)
+        self.sleeping_producers = 0
+        self.sleeping_consumers = 0
+        self.next_home = itertools.count()
+        self.local = threading.local()
+
+    def __len__(self):
+        return sum(len(lane.q) for lane in self.lanes)
+
+    def has_room(self):
+        return len(self) < self.capacity or self.stopped
+
+    def has_item(self):
+        return len(self) > 0 or self.stopped
+
+    def lane_order(self):
+        # home lane first, then the others in ring order (built once per thread)
+        try:
+            return self.local.order
+        except AttributeError:
+            home = next(self.next_home) % len(self.lanes)
+            order = self.local.order = self.lanes[home:] + self.lanes[:home]
+            return order
+
+    def produce(self, item):
+        return self.produce_many((item,))[0] == 1
+
+    def consume(self):
+        items, _ = self.consume_many(1)
+        return items[0] if items else None
+
+    def produce_many(self, items):
+        """Move as many of `items` as fit into the first lane with room.
+
+        Returns (moved, occupancy); moved is 0 once stopped.
+        """
+        while not self.stopped:
+            for lane in self.lane_order():
+                with lane.lock:
+                    q = lane.q
+                    n = min(len(items), q.capacity - len(q))
+                    for i in range(n):
+                        q.append(items[i])
+                if n:
+                    if self.sleeping_consumers:
+                        with self.idle:
+                            self.not_empty.notify(n)
+                    return n, len(self)
+            with self.idle:
+                self.sleeping_producers += 1
+                self.not_full.wait_for(self.has_room)
+                self.sleeping_producers -= 1
+        return 0, len(self)
+
+    def consume_many(self, max_n, timeout=None):
+        """Take up to `max_n` items from the first non-empty lane.
+
+        Blocks until an item is available anywhere, `timeout` expires or the
+        buffer is stopped; returns (items, occupancy) where items is a
+        possibly empty list.
+        """
+        while True:
+            for lane in self.lane_order():
+                with lane.lock:
+                    q = lane.q
+                    items = [q.popleft() for _ in range(min(max_n, len(q)))]
+                if items:
+                    if self.sleeping_producers:
+                        with self.idle:
+                            self.not_full.notify(len(items))
+                    return items, len(self)
+            if self.stopped:
+                return [], len(self)
+            with self.idle:
+                self.sleeping_consumers += 1
+                ready = self.not_empty.wait_for(self.has_item, timeout)
+                self.sleeping_consumers -= 1
+            if not ready:
+                return [], len(self)
+
+    def stop(self):
+        with self.idle:
+            self.stopped = True
+            self.not_full.notify_all()
+            self.not_empty.notify_all()
+
+class WorkStealingBuffer:
+    """Bounded buffer where every consumer owns a local deque.
+
+    Producers hand each batch to the least-loaded consumer deque (or
+    round-robin with policy="round_robin"). A consumer takes from the head
+    of its own deque and, when that is empty, steals from the tail of the
+    others. Consumers register on their first consume; until then items
+    go to the first deque. Capacity is a counting semaphore of free slots
+    (stop() releases one poison permit, as in SemaphoreBuffer), and idle
+    consumers sleep on a shared condition that producers only notify
+    while someone is asleep. `steals` maps consumer thread name -> items stolen.
+    """
+    def __init__(self, capacity, metrics=None, policy="least_loaded"):
+        if policy not in ("least_loaded", "round_robin"):
+            raise ValueError(f"unknown distribution policy: {policy!r}")
+        self.capacity = capacity
+        self.policy = policy
+        self.stopped = False
+        self.deques = [deque()]     # deques[i] is owned by the i-th registered consumer
+        self.owners = 0
+        self.steals = {}
+        self.rr = itertools.count()
+        self.local = threading.local()
+        if metrics is None:
+            self.empty = threading.Semaphore(capacity)
+            self.lock = threading.Lock()
+            self.not_empty = threading.Condition(self.lock)
+        else:
+            self.empty = InstrumentedSemaphore(capacity, "empty", metrics)
+            self.lock = InstrumentedLock("lock", metrics)
+            self.not_empty = InstrumentedCondition(self.lock, "not_empty", metrics)
+        self.sleeping = 0
+
+    def __len__(self):
+        return sum(len(d) for d in self.deques)
+
+    def has_item(self):
+        return len(self) > 0 or self.stopped
+
+    def own_deque(self):
+        try:
+            return self.local.own
+        except AttributeError:
+            with self.lock:
+                if self.owners == len(self.deques):
+                    self.deques = self.deques + [deque()]
+                own = self.deques[self.owners]
+                self.owners += 1
+            self.local.own = own
+            self.steals[threading.current_thread().name] = 0
+            return own
+
+    def target(self):
+        deques = self.deques[:max(1, self.owners)]
+        if self.policy == "round_robin":
+            return deques[next(self.rr) % len(deques)]
+        return min(deques, key=len)
+
+    def produce(self, item):
+        return self.produce_many((item,))[0] == 1
+
+    def consume(self):
+        items, _ = self.consume_many(1)
+        return items[0] if items else None
+
+    def produce_many(self, items):
+        """Put up to len(items) items on one consumer's deque; returns (moved, occupancy)."""
+        n = acquire_many(self.empty, len(items), lambda: self.stopped)
+        if n == 0:
+            return 0, len(self)
+        self.target().extend(items[:n])
+        if self.sleeping:
+            with self.lock:
+                self.not_empty.notify(n)
+        return n, len(self)
+
+    def take(self, own, max_n):
+        items = []
+        try:
+            while len(items) < max_n:
+                items.append(own.popleft())
+        except IndexError:
+            pass
+        if items:
+            return items
+        for d in self.deques:
+            if d is own:
+                continue
+            try:
+                while len(items) < max_n:
+                    items.append(d.pop())
+            except IndexError:
+                pass
+            if items:
+                self.steals[threading.current_thread().name] += len(items)
+                return items
+        return items
+
+    def consume_many(self, max_n, timeout=None):
+        """Take up to `max_n` items from the own deque, else steal from another's tail.
+
+        Returns (items, occupancy).
+        """
+        own = self.own_deque()
+        while True:
+            items = self.take(own, max_n)
+            if items:
+                self.empty.release(len(items))
+                return items, len(self)
+            if self.stopped:
+                return [], len(self)
+            with self.lock:
+                self.sleeping += 1
+                ready = self.not_empty.wait_for(self.has_item, timeout)
+                self.sleeping -= 1
+            if not ready:
+                return [], len(self)
+
+    def stop(self):
+        self.stopped = True
+        self.empty.release()
+        with self.lock:
+            self.not_empty.notify_all()
+
+# Mode name (as shown in the GUI) -> buffer model class
+BUFFER_MODELS = {
+    "Monitor": MonitorBuffer,
+    "Semaphore": SemaphoreBuffer,
+    "SPSC": SPSCBuffer,
+    "Sharded": ShardedBuffer,
+    "WorkStealing": WorkStealingBuffer,
+}
+
+# Models that only allow one producer and one consumer thread
+SINGLE_PAIR_MODELS = {"SPSC"}
+
+def make_buffer(mode, capacity, metrics=None):
+    try:
+        cls = BUFFER_MODELS[mode]
+    except KeyError:
+        raise ValueError(f"unknown buffer mode: {mode!r}") from None
+    return cls(capacity, metrics=metrics)
@@ -0,0 +1,270 @@
+# cli.py
+"""
+Command-line entry point for headless runs.
+
+    python -m cli run --mode Semaphore -p 4 -c 2 --capacity 16 --duration 5
+    python -m cli run --items 10000 --prod-delay 0 --cons-delay 0 --format csv -o runs.csv
+    python -m cli run --virtual --duration 3600
+    python -m cli run --asyncio -p 50000 -c 50000 --capacity 1000 --duration 10
+    python -m cli run --processes --mode Semaphore -p 4 -c 4 --items 20000 --prod-delay 0 --cons-delay 0
+    python -m cli pipeline --stages 2:300,4:450:exp:Semaphore:8,1:200 --duration 10
+    python -m cli sweep -p 1-8 -c 1-8 --capacity 5,50 --items 2000 --delays 1/1 --virtual -o sweep.csv
+
+Prints (or writes) one result row as JSON or CSV so scripted runs can
+compare configurations without opening the Tk window.
+"""
+
+import argparse, csv, io, json, os, sys
+
+from buffers import BUFFER_MODELS, SINGLE_PAIR_MODELS
+from engine import SimulationEngine
+from virtual import VIRTUAL_BUFFER_MODELS, VirtualEngine, check_think_times
+from aio import AsyncEngine
+from multiproc import ProcessEngine
+from pipeline import PIPELINE_MODES, PipelineEngine, parse_stages
+import sweep
+
+
+def positive_int(text):
+    """argparse type for thread counts, capacities and item limits: an int >= 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Headless Producer–Consumer simulator")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run one simulation and report its results")
+    run.add_argument("--mode", choices=list(BUFFER_MODELS), default="Monitor")
+    run.add_argument("-p", "--producers", type=positive_int, default=2)
+    run.add_argument("-c", "--consumers", type=positive_int, default=2)
+    run.add_argument("--capacity", type=positive_int, default=5)
+    run.add_argument("--prod-delay", type=float, default=300, help="producer think time per item (ms)")
+    run.add_argument("--cons-delay", type=float, default=450, help="consumer think time per item (ms)")
+    run.add_argument("--prod-jitter", type=float, default=250, help="max random extra producer delay (ms)")
+    run.add_argument("--cons-jitter", type=float, default=450, help="max random extra consumer delay (ms)")
+    run.add_argument("--batch", type=int, default=1, help="items moved per produce/consume call")
+    limit = run.add_mutually_exclusive_group(required=True)
+    limit.add_argument("--duration", type=float, help="run for this many seconds")
+    limit.add_argument("--items", type=positive_int, help="run until this many items are consumed")
+    run.add_argument("--seed", type=int, default=None)
+    runner = run.add_mutually_exclusive_group()
+    runner.add_argument("--virtual", action="store_true", help="discrete-event run in virtual time (duration is virtual seconds)")
+    runner.add_argument("--asyncio", action="store_true", help="run producers/consumers as asyncio tasks (Monitor/Semaphore only)")
+    runner.add_argument("--processes", action="store_true", help="run each producer/consumer in its own process over shared memory (Semaphore only)")
+    run.add_argument("--no-spsc", dest="spsc", action="store_false", help="keep --mode for 1P1C runs instead of the SPSC fast path")
+    run.add_argument("--instrument", action="store_true", help="record lock/semaphore contention (wait, hold, contended, spurious)")
+    run.add_argument("--metrics", metavar="FILE", help="with --instrument, write the per-thread metrics snapshot as JSON")
+    run.add_argument("--timeline-spill", metavar="DIR", help="write each thread's full state history to DIR/<thread>.tl")
+    run.add_argument("--record-delays", metavar="FILE", help="save every drawn think time (and the seed) to FILE")
+    run.add_argument("--replay-delays", metavar="FILE", help="replay think times and seed recorded with --record-delays")
+    run.add_argument("--format", choices=["json", "csv"], default="json")
+    run.add_argument("-o", "--output", help="write to this file (CSV rows are appended) instead of stdout")
+
+    pl = sub.add_parser("pipeline", help="run a multi-stage pipeline and report per-stage figures")
+    pl.add_argument("--stages", default="2:300,3:450,1:200", metavar="SPEC",
+                    help="comma-separated WORKERS:SERVICE_MS[:const|uniform|exp][:MODE][:CAPACITY], source first")
+    pl.add_argument("--mode", choices=PIPELINE_MODES, default="Monitor", help="queue model for stages that do not set one")
+    pl.add_argument("--capacity", type=positive_int, default=5, help="queue capacity for stages that do not set one")
+    pl.add_argument("--batch", type=int, default=1, help="items moved per take/put")
+    limit = pl.add_mutually_exclusive_group(required=True)
+    limit.add_argument("--duration", type=float, help="run for this many seconds")
+    limit.add_argument("--items", type=positive_int, help="run until this many items leave the last stage")
+    pl.add_argument("--seed", type=int, default=None)
+    pl.add_argument("--record-delays", metavar="FILE", help="save every drawn service time (and the seed) to FILE")
+    pl.add_argument("--replay-delays", metavar="FILE", help="replay service times and seed recorded with --record-delays")
+    pl.add_argument("--format", choices=["json", "csv"], default="json", help="csv writes one row per stage")
+    pl.add_argument("-o", "--output", help="write to this file (CSV rows are appended) instead of stdout")
+
+    sw = sub.add_parser("sweep", help="run a parameter grid in parallel into one CSV table (resumable)")
+    sw.add_argument("--modes", default=None,
+                    help="comma-separated modes (default: every multi-pair mode, or Monitor,Semaphore with --virtual;"
+                         " single-pair modes such as SPSC only run 1P1C points)")
+    sw.add_argument("-p", "--producers", default="1-4", help="e.g. 1-64 or 1,2,4,8")
+    sw.add_argument("-c", "--consumers", default="1-4", help="e.g. 1-64 or 1,2,4,8")
+    sw.add_argument("--capacity", default="5", help="e.g. 5,50,500")
+    sw.add_argument("--delays", nargs="+", default=["0/0"], metavar="P/C[/PJ/CJ]",
+                    help="delay profiles in ms: producer/consumer think time, optional jitter")
+    sw.add_argument("--batch", type=int, default=1)
+    limit = sw.add_mutually_exclusive_group(required=True)
+    limit.add_argument("--duration", type=float, help="seconds per point")
+    limit.add_argument("--items", type=positive_int, help="items consumed per point")
+    sw.add_argument("--seed", type=int, default=None)
+    sw.add_argument("--virtual", action="store_true", help="run points in virtual time")
+    sw.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    sw.add_argument("-o", "--output", required=True, help="CSV results table; existing points are skipped")
+    return parser
+
+
+def engine_from_args(args):
+    if args.virtual:
+        cls = VirtualEngine
+    elif getattr(args, "asyncio", False):
+        cls = AsyncEngine
+    elif getattr(args, "processes", False):
+        cls = ProcessEngine
+    else:
+        cls = SimulationEngine
+    return cls(
+        mode=args.mode,
+        producers=args.producers,
+        consumers=args.consumers,
+        capacity=args.capacity,
+        prod_delay_ms=args.prod_delay,
+        cons_delay_ms=args.cons_delay,
+        batch_size=args.batch,
+        prod_jitter=args.prod_jitter / 1000.0,
+        cons_jitter=args.cons_jitter / 1000.0,
+        seed=args.seed,
+        instrument=getattr(args, "instrument", False),
+        timeline_spill=getattr(args, "timeline_spill", None),
+        record_delays=getattr(args, "record_delays", None),
+        replay_delays=getattr(args, "replay_delays", None),
+        spsc_fast_path=getattr(args, "spsc", True),
+    )
+
+
+def format_result(result, fmt, header=True, fieldnames=None):
+    """One result as a JSON line or a CSV row; `fieldnames` pins the CSV columns."""
+    if fmt == "json":
+        return json.dumps(result) + "\n"
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=fieldnames or list(result), extrasaction="ignore", lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerow(result)
+    return out.getvalue()
+
+
+def csv_header(path):
+    """Column names of an existing CSV table, or None if it is missing/empty.
+
+    Result rows differ per mode (steal counts, --instrument totals), so rows
+    appended to a table are written under its existing header, as sweeps do.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, newline="") as f:
+        return next(csv.reader(f), None)
+
+
+def cmd_run(args):
+    engine = engine_from_args(args)
+    try:
+        result = engine.run(duration=args.duration, max_items=args.items)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.metrics and engine.metrics is not None:
+        with open(args.metrics, "w") as f:
+            json.dump(engine.metrics_snapshot(), f, indent=2)
+    if args.output:
+        # append so repeated invocations build up one comparison table
+        fieldnames = csv_header(args.output) if args.format == "csv" else None
+        header = fieldnames is None and (not os.path.exists(args.output) or os.path.getsize(args.output) == 0)
+        with open(args.output, "a", newline="") as f:
+            f.write(format_result(result, args.format, header, fieldnames))
+    else:
+        sys.stdout.write(format_result(result, args.format))
+    return 0
+
+
+def cmd_pipeline(args):
+    try:
+        stages = parse_stages(args.stages)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    engine = PipelineEngine(
+        stages,
+        mode=args.mode,
+        capacity=args.capacity,
+        batch_size=args.batch,
+        seed=args.seed,
+        record_delays=args.record_delays,
+        replay_delays=args.replay_delays,
+    )
+    result = engine.run(duration=args.duration, max_items=args.items)
+    sys.stderr.write(f"bottleneck: {result['bottleneck']}\n")
+    if args.format == "csv":
+        run_cols = {k: result[k] for k in ("pipeline", "seed", "elapsed_s", "throughput", "bottleneck")}
+        rows = [dict(run_cols, **stage) for stage in result["stages"]]
+    else:
+        rows = [result]
+    header, fieldnames = True, None
+    out = open(args.output, "a", newline="") if args.output else sys.stdout
+    try:
+        if args.output:
+            header = os.path.getsize(args.output) == 0
+            if args.format == "csv":
+                fieldnames = csv_header(args.output)
+        for row in rows:
+            out.write(format_result(row, args.format, header, fieldnames))
+            header = False
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+def cmd_sweep(args):
+    allowed = VIRTUAL_BUFFER_MODELS if args.virtual else BUFFER_MODELS
+    if args.modes is None:
+        modes = [m for m in allowed if m not in SINGLE_PAIR_MODELS]
+    else:
+        modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in allowed]
+    if unknown:
+        kind = "virtual-time " if args.virtual else ""
+        raise SystemExit(f"unknown {kind}mode(s): {', '.join(unknown)}")
+    grid = {}
+    for flag in ("producers", "consumers", "capacity"):
+        values = sweep.parse_int_list(getattr(args, flag))
+        if not values or values[0] < 1:
+            raise SystemExit(f"--{flag}: every value must be at least 1")
+        grid[flag] = values
+    delays = [sweep.parse_delay_profile(d) for d in args.delays]
+    if args.virtual:
+        for text, d in zip(args.delays, delays):
+            try:
+                check_think_times((d["prod_delay_ms"] + d["prod_jitter_ms"]) / 1000.0,
+                                  (d["cons_delay_ms"] + d["cons_jitter_ms"]) / 1000.0)
+            except ValueError as e:
+                raise SystemExit(f"--delays {text}: {e}")
+    points = sweep.expand_grid(
+        modes,
+        grid["producers"],
+        grid["consumers"],
+        grid["capacity"],
+        delays,
+        seed=args.seed,
+        batch_size=args.batch,
+    )
+
+    def progress(row, done, total):
+        sys.stderr.write(f"[{done}/{total}] {row['point']}  {row['throughput']} items/s\n")
+
+    def failure(key, exc):
+        sys.stderr.write(f"FAILED {key}: {exc}\n")
+
+    ran, skipped, failed = sweep.run_sweep(points, args.output, duration=args.duration, max_items=args.items,
+                                           virtual=args.virtual, workers=args.workers,
+                                           on_result=progress, on_error=failure)
+    sys.stderr.write(f"sweep done: {ran} run, {skipped} already in {args.output}, {failed} failed\n")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return cmd_run(args)
+    if args.command == "pipeline":
+        return cmd_pipeline(args)
+    if args.command == "sweep":
+        return cmd_sweep(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
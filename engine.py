@@ -0,0 +1,399 @@
+# engine.py
+"""
+Headless Producer–Consumer simulation engine.
+- Owns the buffer model, worker threads, counters and timeline
+- Publishes an event stream to subscribers (the GUI is just one of them)
+- No tkinter import, so it runs on headless CI boxes and servers
+"""
+
+import threading, time
+
+from buffers import BUFFER_MODELS, SINGLE_PAIR_MODELS, make_buffer
+from stats import ShardedCounter, ShardedHistogram, ShardedMax
+from instrument import LockMetrics
+from timeline import Timeline, DEFAULT_CAPACITY as TIMELINE_CAPACITY
+from schedule import DelaySchedule, new_seed
+
+# Event tuples published to subscribers:
+#   ("log", tag, msg)           tag is "P", "C", "S" or "W"
+#   ("slot_update", n)          current buffer occupancy
+#   ("set_thread", name, state) state is "Ready", "Running", "Waiting" or "Stopped"
+#   ("finished",)               every worker has stopped
+#
+# Items in the buffer are (label, enqueue_ns) pairs; consumers record
+# produce→consume latency into engine.latency.
+
+
+class SimulationEngine:
+    """Runs producer/consumer worker threads against one bounded buffer.
+
+    Settings are plain attributes so they can be changed while running
+    (the GUI copies its Tk variables into them); workers only ever read
+    these attributes, never Tk state.
+    """
+    compact_delays = False      # HashRandom delay streams (for engines with very many actors)
+
+    def __init__(self, mode="Monitor", producers=2, consumers=2, capacity=5,
+                 prod_delay_ms=300, cons_delay_ms=450, batch_size=1,
+                 prod_jitter=0.25, cons_jitter=0.45, seed=None, max_items=None,
+                 instrument=False, timeline_capacity=TIMELINE_CAPACITY, timeline_spill=None,
+                 record_delays=None, replay_delays=None, spsc_fast_path=True):
+        self.mode = mode
+        self.producers = producers
+        self.consumers = consumers
+        self.capacity = capacity
+        self.prod_delay_ms = prod_delay_ms
+        self.cons_delay_ms = cons_delay_ms
+        self.batch_size = batch_size
+        self.prod_jitter = prod_jitter
+        self.cons_jitter = cons_jitter
+        self.seed = seed                # None = draw a fresh seed per run (reported as results()["seed"])
+        self.max_items = max_items      # stop after this many items are consumed (None = run until stop())
+        self.instrument = instrument    # wrap the buffer's lock/conditions/semaphores with LockMetrics
+        self.timeline_capacity = timeline_capacity  # events kept in memory per thread
+        self.timeline_spill = timeline_spill        # directory for full per-thread history (None = off)
+        self.record_delays = record_delays  # save every drawn think time to this file after the run
+        self.replay_delays = replay_delays  # replay think times (and seed) from a recorded file
+        self.spsc_fast_path = spsc_fast_path    # use SPSCBuffer whenever producers == consumers == 1
+
+        self.running = False
+        self.stop_event = threading.Event()
+        self.subscribers = []
+        self.buffer_model = None
+        self.threads = []
+        self._alive_lock = threading.Lock()
+        self._alive = 0
+        self._count_lock = threading.Lock()
+        self._stop_lock = threading.Lock()
+        self.reset()
+
+    # -------------------------
+    # Event stream
+    # -------------------------
+    # subscribers is replaced, never mutated, so emit() can iterate it
+    # from any thread while the GUI subscribes/unsubscribes
+    def subscribe(self, callback):
+        """Register `callback(event)`; it is called from worker threads."""
+        self.subscribers = self.subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        self.subscribers = [cb for cb in self.subscribers if cb is not callback]
+
+    def emit(self, *event):
+        for cb in self.subscribers:
+            cb(event)
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def thread_names(self):
+        return [f"P{i+1}" for i in range(self.producers)] + [f"C{j+1}" for j in range(self.consumers)]
+
+    def reset(self):
+        """Clear counters and timeline; only valid while not running."""
+        # per-thread cells, merged by the produced_count/consumed_count/peak_buffer properties
+        self.produced = ShardedCounter()
+        self.consumed = ShardedCounter()
+        self.peak = ShardedMax()
+        self.thread_states = {}
+        if getattr(self, "timeline_data", None) is not None:
+            self.timeline_data.close()
+        self.timeline_data = Timeline(self.timeline_capacity, self.timeline_spill)
+        # time each produce/consume call spent blocked in the buffer (bounded, ns)
+        self.waits = {"produce": ShardedHistogram(), "consume": ShardedHistogram()}
+        self.latency = ShardedHistogram()
+        self.metrics = LockMetrics() if self.instrument else None
+        self.started_at = self.stopped_at = None
+        self._claimed = 0
+        self._unconsumed = self.max_items     # counted down by count_consumed()
+        self.run_seed = self.seed
+        self.delays = None
+        self.buffer_mode = self.mode    # model actually used by the run (see resolve_mode)
+
+    @property
+    def produced_count(self):
+        return self.produced.value()
+
+    @property
+    def consumed_count(self):
+        return self.consumed.value()
+
+    @property
+    def peak_buffer(self):
+        return self.peak.value()
+
+    def resolve_mode(self):
+        """Buffer model for the configured mode and thread counts.
+
+        1P1C runs switch to the lock-free SPSC ring unless spsc_fast_path is
+        off; single-pair models reject any other thread counts.
+        """
+        if self.mode not in BUFFER_MODELS:
+            raise ValueError(f"unknown buffer mode: {self.mode!r}")
+        single = self.producers == 1 and self.consumers == 1
+        if self.mode in SINGLE_PAIR_MODELS and not single:
+            raise ValueError(f"{self.mode} mode needs exactly one producer and one consumer")
+        if single and self.spsc_fast_path:
+            return "SPSC"
+        return self.mode
+
+    def start(self):
+        if self.running:
+            return False
+        mode = self.resolve_mode()
+        self.running = True
+        self.stop_event.clear()
+        self.reset()
+        self.buffer_mode = mode
+        self.delays = self.make_schedule()
+        self.buffer_model = make_buffer(mode, self.capacity, metrics=self.metrics)
+        for name in self.thread_names():
+            self.thread_states[name] = "Ready"
+            self.timeline_data.track(name)
+
+        self.threads = []
+        self._alive = self.producers + self.consumers
+        self.started_at = time.perf_counter()
+        for i in range(self.producers):
+            t = threading.Thread(target=self.producer_worker, args=(i+1,), name=f"P{i+1}", daemon=True)
+            t.start(); self.threads.append(t)
+        for j in range(self.consumers):
+            t = threading.Thread(target=self.consumer_worker, args=(j+1,), name=f"C{j+1}", daemon=True)
+            t.start(); self.threads.append(t)
+        return True
+
+    def stop(self):
+        if not self.begin_stop():
+            return False
+        if self.buffer_model is not None:
+            self.buffer_model.stop()
+        return True
+
+    def begin_stop(self):
+        """Mark the run stopped; True only for the one caller that did it.
+
+        Several consumers can reach max_items at once while the GUI also
+        presses Stop, so the running -> stopped switch is taken under a lock.
+        """
+        with self._stop_lock:
+            if not self.running:
+                return False
+            self.stop_event.set()
+            self.running = False
+            self.stopped_at = time.perf_counter()
+            return True
+
+    def join(self, timeout=None):
+        """Wait for every worker thread; returns True if all have exited."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for t in self.threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(t.is_alive() for t in self.threads)
+
+    def run(self, duration=None, max_items=None):
+        """Run headless until `duration` seconds pass or `max_items` are consumed.
+
+        Blocks the calling thread and returns results(); with neither limit
+        it runs until another thread calls stop().
+        """
+        if max_items is not None:
+            self.max_items = max_items
+        done = threading.Event()
+        def on_event(event):
+            if event[0] == "finished":
+                done.set()
+        self.subscribe(on_event)
+        try:
+            self.start()
+            done.wait(duration)
+            self.stop()
+            self.join()
+            self.finish_run()
+        finally:
+            self.unsubscribe(on_event)
+        return self.results()
+
+    def make_schedule(self):
+        """Per-worker delay streams for a new run: replayed from file, or seeded."""
+        record = self.record_delays is not None
+        if self.replay_delays is not None:
+            sched = DelaySchedule.load(self.replay_delays, record=record, compact=self.compact_delays)
+        else:
+            sched = DelaySchedule(self.seed if self.seed is not None else new_seed(), record=record,
+                                  compact=self.compact_delays)
+        self.run_seed = sched.seed
+        return sched
+
+    def finish_run(self):
+        """Flush per-run files (timeline spill, recorded delays) once workers are done."""
+        self.timeline_data.close()
+        if self.record_delays is not None and self.delays is not None:
+            self.delays.save(self.record_delays)
+
+    def results(self):
+        """Summary of the last run as a flat dict (times in ms, throughput in items/s)."""
+        end = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        elapsed = (end - self.started_at) if self.started_at is not None else 0.0
+        res = {
+            "mode": self.buffer_mode,
+            "producers": self.producers,
+            "consumers": self.consumers,
+            "capacity": self.capacity,
+            "prod_delay_ms": self.prod_delay_ms,
+            "cons_delay_ms": self.cons_delay_ms,
+            "batch_size": self.batch_size,
+            "seed": self.run_seed,
+            "elapsed_s": round(elapsed, 6),
+            "produced": self.produced_count,
+            "consumed": self.consumed_count,
+            "throughput": round(self.consumed_count / elapsed, 3) if elapsed > 0 else 0.0,
+            "peak_buffer": self.peak_buffer,
+        }
+        for op, sharded in self.waits.items():
+            hist = sharded.merged()
+            for q in (50, 90, 99):
+                res[f"{op}_wait_p{q}_ms"] = round(hist.value_at(q) / 1e6, 3)
+            res[f"{op}_blocked_s"] = round(hist.sum / 1e9, 6)
+        for k, v in self.latency.snapshot().items():
+            if k != "count":
+                res[f"latency_{k}_ms"] = v
+        steals = self.steal_counts()
+        if steals is not None:
+            res["steals"] = sum(steals.values())
+        if self.metrics is not None:
+            res.update(self.metrics.totals())
+        res["clock"] = "wall"
+        res["wall_s"] = round(elapsed, 6)
+        return res
+
+    def metrics_snapshot(self):
+        """Per-primitive and per-thread contention metrics, or None if not instrumented."""
+        return self.metrics.snapshot() if self.metrics is not None else None
+
+    def steal_counts(self):
+        """Consumer name -> items it stole, for work-stealing buffers (else None)."""
+        steals = getattr(self.buffer_model, "steals", None)
+        return dict(steals) if steals is not None else None
+
+    def buffer_len(self):
+        return len(self.buffer_model) if self.buffer_model is not None else 0
+
+    def record_wait(self, op, seconds):
+        """Add one blocked time for op ("produce"/"consume") to its histogram."""
+        self.waits[op].record(seconds * 1e9)
+
+    # -------------------------
+    # Producer / Consumer Workers
+    # -------------------------
+    def producer_worker(self, pid):
+        name = f"P{pid}"
+        think = self.delays.stream(name)
+        self.thread_state_change(name, "Running")
+        item_id = 1
+        while not self.stop_event.is_set():
+            batch = self.claim_items(max(1, self.batch_size))
+            if batch == 0:
+                break
+            delay = think.next(self.prod_delay_ms/1000.0, self.prod_jitter, batch)
+            if self.stop_event.wait(delay):
+                break
+            labels = [f"{name}-{item_id + k}" for k in range(batch)]
+            desc = labels[0] if batch == 1 else f"{labels[0]}..{labels[-1]}"
+
+            self.emit("log", "P", f"{name} trying to produce {desc}")
+            self.thread_state_change(name, "Waiting")
+
+            sent = n = peak = 0
+            t0 = time.perf_counter()
+            now_ns = time.monotonic_ns()
+            items = [(label, now_ns) for label in labels]
+            while sent < batch:
+                moved, n = self.buffer_model.produce_many(items[sent:])
+                if moved == 0:
+                    break
+                sent += moved
+                peak = max(peak, n)
+            self.record_wait("produce", time.perf_counter() - t0)
+            if sent < batch:
+                break
+
+            self.produced.add(sent)
+            self.peak.update(peak)
+
+            # Instead of moving items, just update slot fills
+            self.emit("log", "P", f"{name} produced {desc}")
+            self.emit("slot_update", n)
+            self.thread_state_change(name, "Running")
+            item_id += batch
+
+        self.worker_exit(name)
+
+    def consumer_worker(self, cid):
+        name = f"C{cid}"
+        think = self.delays.stream(name)
+        self.thread_state_change(name, "Running")
+        while not self.stop_event.is_set():
+            batch = max(1, self.batch_size)
+            delay = think.next(self.cons_delay_ms/1000.0, self.cons_jitter, batch)
+            if self.stop_event.wait(delay):
+                break
+            self.emit("log", "C", f"{name} trying to consume")
+            self.thread_state_change(name, "Waiting")
+
+            t0 = time.perf_counter()
+            items, n = self.buffer_model.consume_many(batch)
+            self.record_wait("consume", time.perf_counter() - t0)
+            if not items:
+                break
+            now_ns = time.monotonic_ns()
+            for _, enq_ns in items:
+                self.latency.record(now_ns - enq_ns)
+
+            done = self.count_consumed(len(items))
+
+            # update slots only
+            desc = items[0][0] if len(items) == 1 else f"{items[0][0]}..{items[-1][0]} ({len(items)} items)"
+            self.emit("log", "C", f"{name} consumed {desc}")
+            self.emit("slot_update", n)
+            self.thread_state_change(name, "Running")
+            if done:
+                self.stop()
+
+        self.worker_exit(name)
+
+    def claim_items(self, n):
+        """Reserve up to `n` item ids against max_items; returns how many were granted."""
+        if self.max_items is None:
+            return n
+        with self._count_lock:
+            n = min(n, self.max_items - self._claimed)
+            self._claimed += n
+            return n
+
+    def count_consumed(self, n):
+        """Add `n` consumed items; True once max_items have been consumed."""
+        self.consumed.add(n)
+        if self.max_items is None:
+            return False
+        with self._count_lock:
+            self._unconsumed -= n
+            return self._unconsumed <= 0
+
+    def worker_exit(self, name):
+        self.thread_state_change(name, "Stopped")
+        self.emit("log", "S", f"{name} stopped")
+        with self._alive_lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            self.emit("finished")
+
+    def clock(self):
+        """Timestamp used for timeline events (wall clock here; virtual time in VirtualEngine)."""
+        return time.time()
+
+    def thread_state_change(self, name, state):
+        self.thread_states[name] = state
+        # record timeline event
+        self.timeline_data.record(name, state, self.clock())
+        self.emit("set_thread", name, state)
@@ -0,0 +1,187 @@
+# instrument.py
+"""
+Contention instrumentation for the buffer synchronization primitives.
+- InstrumentedLock / InstrumentedCondition wrap MonitorBuffer's lock and conditions
+- InstrumentedSemaphore wraps SemaphoreBuffer's empty/full/mutex
+- LockMetrics collects acquire wait, hold time, contended acquisitions and
+  spurious wakeups per primitive and per thread
+"""
+
+import threading, time
+
+FIELDS = ("acquires", "contended", "wait_ns", "hold_ns", "waits", "wakeups", "spurious")
+
+
+class LockMetrics:
+    """Thread-safe store of per-(primitive, thread) counters."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+
+    def record(self, primitive, **deltas):
+        key = (primitive, threading.current_thread().name)
+        with self.lock:
+            d = self.data.get(key)
+            if d is None:
+                d = self.data[key] = dict.fromkeys(FIELDS, 0)
+            for k, v in deltas.items():
+                d[k] += v
+
+    def snapshot(self):
+        """{"primitives": {name: totals}, "threads": {name: {thread: stats}}}; times in ms."""
+        with self.lock:
+            items = [(k, dict(v)) for k, v in self.data.items()]
+        prims, threads = {}, {}
+        for (prim, thread), d in items:
+            tot = prims.setdefault(prim, dict.fromkeys(FIELDS, 0))
+            for k in FIELDS:
+                tot[k] += d[k]
+            threads.setdefault(prim, {})[thread] = d
+        for group in [prims] + list(threads.values()):
+            for d in group.values():
+                d["wait_ms"] = round(d.pop("wait_ns") / 1e6, 3)
+                d["hold_ms"] = round(d.pop("hold_ns") / 1e6, 3)
+        return {"primitives": prims, "threads": threads}
+
+    def totals(self):
+        """Flat per-primitive totals, e.g. {"lock_wait_ms": ..., "lock_contended": ...}."""
+        flat = {}
+        for prim, d in sorted(self.snapshot()["primitives"].items()):
+            for k in ("acquires", "contended", "wait_ms", "hold_ms", "spurious"):
+                flat[f"{prim}_{k}"] = d[k]
+        return flat
+
+
+class InstrumentedLock:
+    """threading.Lock replacement that records wait/hold time and contention."""
+    def __init__(self, name, metrics):
+        self.name = name
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._owner = None
+        self._held_since = 0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            self._owner = threading.get_ident()
+            self._held_since = time.perf_counter_ns()
+            self.metrics.record(self.name, acquires=1)
+            return True
+        if not blocking:
+            return False
+        t0 = time.perf_counter_ns()
+        ok = self._lock.acquire(True, timeout)
+        now = time.perf_counter_ns()
+        if ok:
+            self._owner = threading.get_ident()
+            self._held_since = now
+            self.metrics.record(self.name, acquires=1, contended=1, wait_ns=now - t0)
+        return ok
+
+    def release(self):
+        held = time.perf_counter_ns() - self._held_since
+        self._owner = None
+        self._lock.release()
+        self.metrics.record(self.name, hold_ns=held)
+
+    def locked(self):
+        return self._lock.locked()
+
+    # used by threading.Condition instead of its acquire(False) probe
+    def _is_owned(self):
+        return self._owner == threading.get_ident()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class InstrumentedCondition:
+    """threading.Condition over an InstrumentedLock that counts wakeups.
+
+    A wakeup after which wait_for's predicate is still false counts as
+    spurious (e.g. a notify raced by another thread taking the slot).
+    """
+    def __init__(self, lock, name, metrics):
+        self.name = name
+        self.metrics = metrics
+        self._cond = threading.Condition(lock)
+
+    def __enter__(self):
+        return self._cond.__enter__()
+
+    def __exit__(self, *exc):
+        return self._cond.__exit__(*exc)
+
+    def wait(self, timeout=None):
+        t0 = time.perf_counter_ns()
+        ok = self._cond.wait(timeout)
+        self.metrics.record(self.name, waits=1, wakeups=1 if ok else 0, wait_ns=time.perf_counter_ns() - t0)
+        return ok
+
+    def wait_for(self, predicate, timeout=None):
+        end = None if timeout is None else time.monotonic() + timeout
+        result = predicate()
+        while not result:
+            remaining = None
+            if end is not None:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    break
+            woke = self.wait(remaining)
+            result = predicate()
+            if woke and not result:
+                self.metrics.record(self.name, spurious=1)
+        return result
+
+    def notify(self, n=1):
+        self._cond.notify(n)
+
+    def notify_all(self):
+        self._cond.notify_all()
+
+
+class InstrumentedSemaphore:
+    """threading.Semaphore wrapper recording acquire wait and contention.
+
+    Hold time is only meaningful when the acquiring thread also releases
+    (the mutex), so it is tracked only with track_hold=True.
+    """
+    def __init__(self, value, name, metrics, track_hold=False):
+        self.name = name
+        self.metrics = metrics
+        self._sem = threading.Semaphore(value)
+        self.track_hold = track_hold
+        self._local = threading.local()
+
+    def acquire(self, blocking=True, timeout=None):
+        if self._sem.acquire(False):
+            self._mark_held()
+            self.metrics.record(self.name, acquires=1)
+            return True
+        if not blocking:
+            return False
+        t0 = time.perf_counter_ns()
+        ok = self._sem.acquire(True, timeout)
+        if ok:
+            self._mark_held()
+            self.metrics.record(self.name, acquires=1, contended=1, wait_ns=time.perf_counter_ns() - t0)
+        return ok
+
+    def release(self, n=1):
+        if self.track_hold:
+            since = getattr(self._local, "since", None)
+            if since is not None:
+                self._local.since = None
+                self.metrics.record(self.name, hold_ns=time.perf_counter_ns() - since)
+        self._sem.release(n)
+
+    def _mark_held(self):
+        if self.track_hold:
+            self._local.since = time.perf_counter_ns()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
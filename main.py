@@ -10,8 +10,24 @@ Interactive Multithreading Simulator — VERSION C
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext
-import threading, time, random, queue, math
+from tkinter import ttk
+import time, math, threading
+from collections import deque
+
+from buffers import BUFFER_MODELS
+from engine import SimulationEngine
+from aio import AsyncEngine
+from multiproc import ProcessEngine
+from pipeline import PipelineEngine, parse_stages
+from timeline import STATES
+
+# Runner name (as shown in the GUI) -> engine class
+ENGINES = {
+    "Threads": SimulationEngine,
+    "asyncio": AsyncEngine,
+    "Processes": ProcessEngine,
+    "Pipeline": PipelineEngine,
+}
 
 # -------------------------
 # Helpers
@@ -40,120 +56,505 @@ NEON = {
 }
 
 # -------------------------
-# Synchronization Models
+# Timeline (retained mode)
 # -------------------------
-class MonitorBuffer:
-        """Bounded buffer implemented using monitor-style locking and conditions.
+STATE_COLORS = {"Running": "#1ed760", "Waiting": "#f7d33e", "Stopped": "#9a9a9a"}
+CODE_COLORS = [STATE_COLORS.get(s, "#444") for s in STATES]    # indexed by timeline state code
+
+class ScrollWindow:
+    """Mixin for canvas views showing `rows` rows of a longer list from `top`.
 
-    Producers block when the buffer is full, and consumers block when it is empty.
-    This models the classic Producer–Consumer problem using monitors (thread-safe).
+    Subclasses provide count() and redraw(); the scrollbar and mouse wheel
+    only move `top`, the canvas items themselves are a fixed pool.
     """
-    def __init__(self, capacity):
-        self.capacity = capacity
-        self.q = []
-        self.lock = threading.Lock()
-        self.not_full = threading.Condition(self.lock)
-        self.not_empty = threading.Condition(self.lock)
+    top = 0
+    scrollbar = None
+
+    def attach_scroll(self, scrollbar, *widgets):
+        self.scrollbar = scrollbar
+        scrollbar.configure(command=self.on_scroll)
+        for widget in (scrollbar,) + widgets:
+            widget.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-1))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+    def scroll_to(self, index):
+        self.top = max(0, min(index, self.count() - self.rows))
+        self.redraw()
+        self.update_scrollbar()
+
+    def scroll_by(self, lines):
+        self.scroll_to(self.top + lines)
+        return "break"
+
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.count()))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def update_scrollbar(self):
+        n = self.count()
+        if self.scrollbar is not None:
+            self.scrollbar.set(self.top / n if n else 0.0, min(n, self.top + self.rows) / n if n else 1.0)
+
+
+class TimelineView(ScrollWindow):
+    """Gantt-style timeline drawn with a fixed pool of canvas items.
+
+    Only the `rows` tracks that fit the canvas exist as items (a stripe, a
+    label and BLOCKS rectangles each); scrolling rebinds pool rows to other
+    threads. render() only reconfigures blocks whose color changed since
+    the last frame, so Tk item count and per-frame work stay flat no matter
+    how long the run is or how many threads it has.
+    """
+    BLOCKS = 40
+    LEFT = 80
+    STEP = 18
+    ROW = 18
+
+    def __init__(self, canvas, height):
+        self.canvas = canvas
+        self.rows = max(1, height // self.ROW)
+        self.names = []
+        self.pool = []
+        self.data = {}
+
+    def count(self):
+        return len(self.names)
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.names = []
+        self.pool = []
+        self.top = 0
+        self.update_scrollbar()
+
+    def set_tracks(self, names):
+        self.clear()
+        self.names = list(names)
+        c = self.canvas
+        for r in range(min(self.rows, len(self.names))):
+            y = 6 + r*self.ROW
+            c.create_rectangle(0, y, 1200, y+14, fill="#101418", outline="")
+            label = c.create_text(10, y+6, text="", anchor="w", fill=NEON["text"])
+            blocks = []
+            for i in range(self.BLOCKS):
+                x = self.LEFT + i*self.STEP
+                blocks.append(c.create_rectangle(x, y, x+16, y+12, fill="#444", outline="", state="hidden"))
+            # fills[i] is the color block i currently shows (None = hidden)
+            self.pool.append({"name": None, "label": label, "blocks": blocks, "fills": [None] * self.BLOCKS, "seen": -1})
+        self.update_scrollbar()
+
+    def redraw(self):
+        self.render(self.data)
+
+    def render(self, timeline_data):
+        self.data = timeline_data
+        for r, row in enumerate(self.pool):
+            name = self.names[self.top + r]
+            if row["name"] != name:
+                row["name"] = name
+                row["seen"] = -1
+                self.canvas.itemconfig(row["label"], text=name)
+            events = timeline_data.get(name)
+            if events is None or events.total == row["seen"]:
+                continue
+            row["seen"] = events.total
+            codes, _ = events.last(self.BLOCKS)
+            fills = row["fills"]
+            for i, item in enumerate(row["blocks"]):
+                col = CODE_COLORS[codes[i]] if i < len(codes) else None
+                if col == fills[i]:
+                    continue
+                fills[i] = col
+                try:
+                    if col is None:
+                        self.canvas.itemconfig(item, state="hidden")
+                    else:
+                        self.canvas.itemconfig(item, fill=col, state="normal")
+                except tk.TclError:
+                    pass
 
-    def produce(self, item, stop_event):
-        with self.lock:
-            while len(self.q) == self.capacity:
-                if stop_event.is_set(): return False
-                self.not_full.wait(timeout=0.2)
-            self.q.append(item)
-            self.not_empty.notify()
-            return True
-
-    def consume(self, stop_event):
-        with self.lock:
-            while len(self.q) == 0:
-                if stop_event.is_set(): return None
-                self.not_empty.wait(timeout=0.2)
-            item = self.q.pop(0)
-            self.not_full.notify()
-            return item
-
-class SemaphoreBuffer:
-    """Bounded buffer implemented using counting semaphores.
-
-    Uses:
-    - empty: counts free slots in the buffer
-    - full:  counts filled slots in the buffer
-    - mutex: gives mutual exclusion while accessing the queue
-
-    This shows the Producer–Consumer solution using semaphores.
+
+class ThreadTable(ScrollWindow):
+    """Canvas-drawn thread state table with a fixed pool of cells.
+
+    Threads are laid out `cols` per row; only the visible rows have text
+    items. update() just records states (and set_notes() per-thread
+    suffixes such as steal counts); flush() (once per GUI tick) rewrites
+    the cells whose text or color changed.
+    """
+    ROW = 18
+
+    def __init__(self, canvas, width, height, cols=4):
+        self.canvas = canvas
+        self.cols = cols
+        self.rows = max(1, height // self.ROW)
+        self.col_w = width // cols
+        self.names = []
+        self.states = {}
+        self.notes = {}
+        self.cells = []     # [text item, shown text, shown color]
+        self.dirty = False
+
+    def count(self):
+        # rows of cells, not threads
+        return -(-len(self.names) // self.cols)
+
+    def set_threads(self, names):
+        self.canvas.delete("all")
+        self.names = list(names)
+        self.states = dict.fromkeys(self.names, "Ready")
+        self.notes = {}
+        self.top = 0
+        self.cells = []
+        for i in range(min(len(self.names), self.rows * self.cols)):
+            r, c = divmod(i, self.cols)
+            item = self.canvas.create_text(4 + c*self.col_w, 9 + r*self.ROW, text="", anchor="w",
+                                           fill=NEON["muted"], font=("Segoe UI", 9))
+            self.cells.append([item, None, None])
+        self.redraw()
+        self.update_scrollbar()
+
+    def update(self, states):
+        self.states.update(states)
+        self.dirty = True
+
+    def set_notes(self, notes):
+        if notes != self.notes:
+            self.notes = notes
+            self.dirty = True
+
+    def flush(self):
+        if self.dirty:
+            self.redraw()
+
+    def redraw(self):
+        self.dirty = False
+        first = self.top * self.cols
+        for i, cell in enumerate(self.cells):
+            k = first + i
+            if k < len(self.names):
+                name = self.names[k]
+                state = self.states.get(name, "Ready")
+                note = self.notes.get(name)
+                text = f"{name}: {state}" if note is None else f"{name}: {state} ({note})"
+                color = STATE_COLORS.get(state, NEON["muted"])
+            else:
+                text, color = "", NEON["muted"]
+            if text != cell[1] or color != cell[2]:
+                cell[1], cell[2] = text, color
+                try:
+                    self.canvas.itemconfig(cell[0], text=text, fill=color)
+                except tk.TclError:
+                    pass
+
+# -------------------------
+# Buffer slots
+# -------------------------
+class SlotView:
+    """Buffer occupancy drawn on the main canvas.
+
+    Up to MAX_SLOTS slots are drawn as individual pills (scaled to fit the
+    span between the avatars); larger buffers switch to one fill bar.
+    update() only recolors the slots between the old and new occupancy,
+    or moves the bar's edge, so its cost does not depend on capacity.
     """
-    def __init__(self, capacity):
+    MAX_SLOTS = 20
+    X0, X1, Y, H = 240, 670, 200, 44
+    PITCH = 86      # slot width + gap at full size
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.capacity = 0
+        self.slots = []     # (rect, left, right) per slot in slot mode
+        self.bar = None     # fill rectangle in bar mode
+        self.shown = 0
+
+    def build(self, capacity):
+        c = self.canvas
+        c.delete("slots")
         self.capacity = capacity
-        self.q = []
-        self.empty = threading.Semaphore(capacity)
-        self.full = threading.Semaphore(0)
-        self.mutex = threading.Semaphore(1)
-
-    def produce(self, item, stop_event):
-        while not stop_event.is_set():
-            if self.empty.acquire(timeout=0.2): break
-        else:
-            return False
+        self.slots = []
+        self.bar = None
+        self.shown = 0
+        x0, y, h = self.X0, self.Y, self.H
+        if capacity > self.MAX_SLOTS:
+            c.create_rectangle(x0, y, self.X1, y+h, fill=NEON["slot_empty"], outline="", tags="slots")
+            self.bar = c.create_rectangle(x0, y, x0, y+h, fill=NEON["slot_fill"], outline="", tags="slots")
+            return
+        pitch = min(self.PITCH, (self.X1 - x0) / capacity)
+        k = pitch / self.PITCH
+        w, r = 68*k, 8*k
+        for i in range(capacity):
+            x1 = x0 + i*pitch
+            rect = c.create_rectangle(x1, y, x1+w, y+h, fill=NEON["slot_empty"], outline="", tags="slots")
+            left = c.create_oval(x1-r, y, x1+2*r, y+h, fill=NEON["slot_empty"], outline="", tags="slots")
+            right = c.create_oval(x1+w-2*r, y, x1+w+r, y+h, fill=NEON["slot_empty"], outline="", tags="slots")
+            self.slots.append((rect, left, right))
+
+    def update(self, n):
+        n = max(0, min(n, self.capacity))
+        if n == self.shown:
+            return
+        try:
+            if self.bar is not None:
+                x = self.X0 + (self.X1 - self.X0) * n / self.capacity
+                self.canvas.coords(self.bar, self.X0, self.Y, x, self.Y+self.H)
+            else:
+                color = NEON["slot_fill"] if n > self.shown else NEON["slot_empty"]
+                for i in range(min(n, self.shown), max(n, self.shown)):
+                    for item in self.slots[i]:
+                        self.canvas.itemconfig(item, fill=color)
+        except tk.TclError:
+            pass
+        self.shown = n
 
-        while not stop_event.is_set():
-            if self.mutex.acquire(timeout=0.2): break
-        else:
-            try: self.empty.release()
-            except: pass
-            return False
-
-        self.q.append(item)
-        try: self.mutex.release()
-        except: pass
-        self.full.release()
-        return True
-
-    def consume(self, stop_event):
-        while not stop_event.is_set():
-            if self.full.acquire(timeout=0.2): break
-        else:
-            return None
+# -------------------------
+# Pipeline stages
+# -------------------------
+class PipelineView:
+    """Pipeline stages drawn as boxes joined by queue fill bars.
 
-        while not stop_event.is_set():
-            if self.mutex.acquire(timeout=0.2): break
-        else:
-            try: self.full.release()
-            except: pass
-            return None
-
-        item = None
-        if len(self.q) != 0:
-            item = self.q.pop(0)
-        try: self.mutex.release()
-        except: pass
-        self.empty.release()
-        return item
+    build() lays out one box per stage and one bar per queue; update()
+    moves the bar edges, rewrites throughput/utilization per stage and
+    outlines the bottleneck stage in red. Items whose text or state has
+    not changed are left alone.
+    """
+    X0, X1, Y, H = 20, 740, 170, 120
+    QH = 22
+    MAX_BOX = 110
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.boxes = []     # (rect, info, flag) per stage
+        self.bars = []      # (fill, label, x0, x1, y, capacity) per queue
+        self.shown = []     # last (info text, hot, depth) per stage
+        self.visible = False
+
+    def build(self, stages, default_mode, default_capacity):
+        c = self.canvas
+        c.delete("pipeline")
+        self.boxes, self.bars = [], []
+        n = len(stages)
+        span = self.X1 - self.X0
+        box_w = min(self.MAX_BOX, span / (n + 0.6 * (n - 1)))
+        gap = (span - n * box_w) / max(1, n - 1)
+        state = "normal" if self.visible else "hidden"
+        muted, red = NEON["muted"], rgb_to_hex(NEON["badge_bad"])
+        for k, st in enumerate(stages):
+            x = self.X0 + k * (box_w + gap)
+            rect = c.create_rectangle(x, self.Y, x+box_w, self.Y+self.H, fill="#0F1318", outline=muted, width=2,
+                                      tags="pipeline", state=state)
+            c.create_text(x+box_w/2, self.Y+14, text=f"{st.name} ×{st.workers}", fill=NEON["text"],
+                          font=("Segoe UI", 9, "bold"), tags="pipeline", state=state)
+            c.create_text(x+box_w/2, self.Y+30, text=f"{st.service_ms:g}ms {st.dist}", fill=muted,
+                          font=("Consolas", 8), tags="pipeline", state=state)
+            info = c.create_text(x+box_w/2, self.Y+self.H/2+18, text="", fill=NEON["text"], font=("Consolas", 8),
+                                 justify="center", tags="pipeline", state=state)
+            flag = c.create_text(x+box_w/2, self.Y-12, text="", fill=red, font=("Segoe UI", 9, "bold"),
+                                 tags="pipeline", state=state)
+            self.boxes.append((rect, info, flag))
+            if k > 0:
+                cap = st.capacity or default_capacity
+                qx0, qx1 = x - gap + 6, x - 6
+                y = self.Y + self.H/2 - self.QH/2
+                c.create_rectangle(qx0, y, qx1, y+self.QH, fill=NEON["slot_empty"], outline="", tags="pipeline", state=state)
+                fill = c.create_rectangle(qx0, y, qx0, y+self.QH, fill=NEON["slot_fill"], outline="", tags="pipeline", state=state)
+                c.create_text((qx0+qx1)/2, y-10, text=st.mode or default_mode, fill=muted, font=("Consolas", 7),
+                              tags="pipeline", state=state)
+                label = c.create_text((qx0+qx1)/2, y+self.QH+10, text=f"0/{cap}", fill=muted, font=("Consolas", 8),
+                                      tags="pipeline", state=state)
+                self.bars.append((fill, label, qx0, qx1, y, cap))
+        self.shown = [None] * n
+
+    def update(self, rows, bottleneck):
+        c = self.canvas
+        red, muted = rgb_to_hex(NEON["badge_bad"]), NEON["muted"]
+        try:
+            for k, (row, (rect, info, flag)) in enumerate(zip(rows, self.boxes)):
+                text = f"{row['throughput']:.1f} items/s\nutil {row['utilization']:.0%}"
+                hot = row["stage"] == bottleneck
+                depth = row["queue_depth"] or 0
+                if self.shown[k] == (text, hot, depth):
+                    continue
+                c.itemconfig(info, text=text)
+                c.itemconfig(rect, outline=red if hot else muted, width=3 if hot else 2)
+                c.itemconfig(flag, text="BOTTLENECK" if hot else "")
+                if k > 0:
+                    fill, label, qx0, qx1, y, cap = self.bars[k-1]
+                    c.coords(fill, qx0, y, qx0 + (qx1 - qx0) * min(depth, cap) / cap, y+self.QH)
+                    c.itemconfig(label, text=f"{depth}/{cap}")
+                self.shown[k] = (text, hot, depth)
+        except tk.TclError:
+            pass
+
+    def reset(self):
+        # back to empty queues and no figures, keeping the layout
+        n = len(self.boxes)
+        self.update([{"stage": None, "throughput": 0.0, "utilization": 0.0, "queue_depth": 0}] * n, None)
+
+    def set_visible(self, on):
+        self.visible = on
+        try:
+            self.canvas.itemconfigure("pipeline", state="normal" if on else "hidden")
+        except tk.TclError:
+            pass
+
+# -------------------------
+# Activity log (virtualized)
+# -------------------------
+LOG_HEADERS = [("P", "─── PRODUCER EVENTS ───"), ("C", "─── CONSUMER EVENTS ───"), ("S", "─── SYSTEM EVENTS ───")]
+
+class LogView:
+    """Activity log backed by a ring of (tag, line) records.
+
+    Only the `rows` visible lines ever live in the Text widget; append()
+    just stores the record and flush() (once per GUI tick) rewrites the
+    visible window in a single insert. The oldest records fall off once
+    `retention` is reached. Scrolled to the bottom it follows new lines.
+    """
+    def __init__(self, parent, retention=5000, rows=18):
+        self.records = deque(maxlen=retention)
+        self.total = 0          # records ever appended; records[0] has seq total - len(records)
+        self.rows = rows
+        self.top = None         # seq of the first visible record, None = follow the tail
+        self.dirty = True
+
+        self.text = tk.Text(parent, height=rows, bg="#0F1318", fg=NEON["text"], font=("Consolas", 10),
+                            bd=0, relief="flat", wrap="none", cursor="arrow")
+        self.scroll = ttk.Scrollbar(parent, orient="vertical", command=self.on_scroll)
+        self.scroll.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        for widget in (self.text, self.scroll):
+            widget.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-1))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+        # tags for colors
+        self.text.tag_config("P", foreground=rgb_to_hex(NEON["producer_neon"]), font=("Consolas", 10, "bold"))
+        self.text.tag_config("C", foreground=rgb_to_hex(NEON["consumer_neon"]), font=("Consolas", 10, "bold"))
+        self.text.tag_config("S", foreground="#9AA0A6", font=("Consolas", 10))
+        self.text.tag_config("W", foreground=rgb_to_hex(NEON["warning"]), font=("Consolas", 10, "bold"))
+
+    def append(self, tag, line):
+        self.records.append((tag, line))
+        self.total += 1
+        self.dirty = True
+
+    def clear(self):
+        self.records.clear()
+        self.top = None
+        self.dirty = True
+
+    def first_visible(self):
+        # index into records of the first visible row
+        last = max(0, len(self.records) - self.rows)
+        if self.top is None:
+            return last
+        return max(0, min(last, self.top - (self.total - len(self.records))))
+
+    def scroll_to(self, index):
+        last = max(0, len(self.records) - self.rows)
+        index = max(0, min(last, index))
+        self.top = None if index >= last else index + self.total - len(self.records)
+        self.dirty = True
+        self.flush()
+
+    def scroll_by(self, lines):
+        self.scroll_to(self.first_visible() + lines * 3)
+        return "break"
+
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.records)))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll_to(self.first_visible() + int(args[1]) * step)
+
+    def flush(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        n = len(self.records)
+        start = self.first_visible()
+        end = min(n, start + self.rows)
+        chunks = []
+        for i in range(start, end):
+            tag, line = self.records[i]
+            chunks += [line + "\n", tag]
+        try:
+            self.text.delete("1.0", tk.END)
+            if chunks:
+                self.text.insert(tk.END, *chunks)
+            self.scroll.set(start / n if n else 0.0, end / n if n else 1.0)
+        except tk.TclError:
+            pass
+
+# -------------------------
+# Coalescing event inbox
+# -------------------------
+class FrameInbox:
+    """Engine subscriber that folds events into at most one frame of state.
+
+    Worker threads call push(); the GUI drains once per tick. Thread states
+    keep only the latest value per thread, slot_update only the final
+    occupancy, and log lines at most `max_logs` (older ones would scroll out
+    of the log ring anyway), so a fast engine never builds a backlog.
+    """
+    def __init__(self, max_logs=5000):
+        self.lock = threading.Lock()
+        self.max_logs = max_logs
+        self._swap()
+
+    def _swap(self):
+        self.logs = deque(maxlen=self.max_logs)
+        self.states = {}
+        self.slots = None
+        self.finished = False
+
+    def push(self, event):
+        cmd = event[0]
+        with self.lock:
+            if cmd == "log":
+                self.logs.append(event[1:])
+            elif cmd == "set_thread":
+                self.states[event[1]] = event[2]
+            elif cmd == "slot_update":
+                self.slots = event[1]
+            elif cmd == "finished":
+                self.finished = True
+
+    def drain(self):
+        """Return (logs, states, slots, finished) gathered since the last drain."""
+        with self.lock:
+            frame = (self.logs, self.states, self.slots, self.finished)
+            self._swap()
+        return frame
 
 # -------------------------
 # Main GUI App
 # -------------------------
 class FullSimulatorC:
+    LOG_RETENTION = 5000    # log records kept for scrollback
+    MAX_THREADS = 500       # per side (producers / consumers) with OS threads
+    MAX_ACTORS = 100_000    # per side with the asyncio runner
+    MAX_PROCESSES = 64      # per side with the process runner
+    MAX_CAPACITY = 1_000_000
+
     def __init__(self, root):
         self.root = root
         self.root.title("Multithreading Simulator — Mode C (Slots Only)")
         self.root.geometry("1240x720")
         self.root.configure(bg=NEON["bg"])
 
-        # state
+        # state: the engine runs the simulation, the GUI only subscribes to its events
         self.capacity = 5
-        self.running = False
-        self.stop_event = threading.Event()
-        self.gui_q = queue.Queue()
-
-        # stats
-        self.produced_count = 0
-        self.consumed_count = 0
-        self.peak_buffer = 0
-
-        # timeline storage
-        self.timeline_data = {}
-        self.track_positions = {}
+        self.engine = SimulationEngine(capacity=self.capacity)
+        self.inbox = FrameInbox(max_logs=self.LOG_RETENTION)
+        self.engine.subscribe(self.inbox.push)
 
         # glow phases
         self.phase_p = 0.0
@@ -178,16 +579,24 @@ class FullSimulatorC:
 
         tk.Label(top, text="Mode:", bg=NEON["panel"], fg=NEON["text"]).place(x=8, y=16)
         self.mode_var = tk.StringVar(value="Monitor")
-        self.mode_combo = ttk.Combobox(top, textvariable=self.mode_var, values=["Monitor", "Semaphore"], state="readonly", width=12)
+        self.mode_combo = ttk.Combobox(top, textvariable=self.mode_var, values=list(BUFFER_MODELS), state="readonly", width=12)
         self.mode_combo.place(x=56, y=14)
 
+        tk.Label(top, text="Runner:", bg=NEON["panel"], fg=NEON["text"]).place(x=8, y=40)
+        self.runner_var = tk.StringVar(value="Threads")
+        ttk.Combobox(top, textvariable=self.runner_var, values=list(ENGINES), state="readonly", width=10).place(x=62, y=38)
+
         tk.Label(top, text="Producers:", bg=NEON["panel"], fg=NEON["text"]).place(x=190, y=16)
         self.p_count = tk.IntVar(value=2)
-        ttk.Spinbox(top, from_=1, to=5, width=4, textvariable=self.p_count).place(x=260, y=14)
+        ttk.Spinbox(top, from_=1, to=self.MAX_ACTORS, width=6, textvariable=self.p_count).place(x=260, y=14)
 
         tk.Label(top, text="Consumers:", bg=NEON["panel"], fg=NEON["text"]).place(x=320, y=16)
         self.c_count = tk.IntVar(value=2)
-        ttk.Spinbox(top, from_=1, to=5, width=4, textvariable=self.c_count).place(x=400, y=14)
+        ttk.Spinbox(top, from_=1, to=self.MAX_ACTORS, width=6, textvariable=self.c_count).place(x=400, y=14)
+
+        tk.Label(top, text="Stages:", bg=NEON["panel"], fg=NEON["text"]).place(x=190, y=40)
+        self.stages_var = tk.StringVar(value="2:300,3:450,1:200")
+        ttk.Entry(top, width=30, textvariable=self.stages_var).place(x=240, y=38)
 
         self.start_btn = tk.Button(top, text="Start", bg="#1f6feb", fg="white", command=self.start)
         self.start_btn.place(x=480, y=10, width=58, height=36)
@@ -204,6 +613,14 @@ class FullSimulatorC:
         self.cons_speed = tk.IntVar(value=450)
         ttk.Entry(top, width=6, textvariable=self.cons_speed).place(x=890, y=14)
 
+        tk.Label(top, text="Batch:", bg=NEON["panel"], fg=NEON["text"]).place(x=700, y=40)
+        self.batch_size = tk.IntVar(value=1)
+        ttk.Spinbox(top, from_=1, to=64, width=4, textvariable=self.batch_size).place(x=760, y=38)
+
+        tk.Label(top, text="Capacity:", bg=NEON["panel"], fg=NEON["text"]).place(x=830, y=40)
+        self.capacity_var = tk.IntVar(value=self.capacity)
+        ttk.Entry(top, width=8, textvariable=self.capacity_var).place(x=890, y=38)
+
         self.status_badge = tk.Label(top, text="Status: Ready", bg=rgb_to_hex(NEON["badge_ok"]), fg="#000", padx=8, pady=4)
         self.status_badge.place(x=1010, y=12)
 
@@ -220,7 +637,10 @@ class FullSimulatorC:
         card = tk.Frame(self.root, bg=NEON["panel"])
         card.place(x=10, y=82, width=760, height=480)
 
-                # Show current buffer usage under the canvas
+        self.canvas = tk.Canvas(card, bg=NEON["panel"], highlightthickness=0)
+        self.canvas.place(x=0, y=0, width=760, height=440)
+
+        # Show current buffer usage under the canvas
         self.buffer_label = tk.Label(
             card,
             text=f"Buffer: 0 / {self.capacity}",
@@ -230,31 +650,68 @@ class FullSimulatorC:
         )
         self.buffer_label.place(x=10, y=445)
 
+        self.build_latency_panel()
+
         self.prod_pos = (120, 240)
         self.cons_pos = (620, 240)
 
         # glow + avatars
-        self.p_glow = self.canvas.create_oval(self.prod_pos[0]-70, self.prod_pos[1]-70, self.prod_pos[0]+70, self.prod_pos[1]+70, fill="", outline="")
-        self.p_avatar = self.canvas.create_oval(self.prod_pos[0]-36, self.prod_pos[1]-36, self.prod_pos[0]+36, self.prod_pos[1]+36, fill="#0d1117")
-        self.p_icon = self.canvas.create_oval(self.prod_pos[0]-16, self.prod_pos[1]-16, self.prod_pos[0]+16, self.prod_pos[1]+16, fill=rgb_to_hex(NEON["producer_neon"]))
+        self.p_glow = self.canvas.create_oval(self.prod_pos[0]-70, self.prod_pos[1]-70, self.prod_pos[0]+70, self.prod_pos[1]+70, fill="", outline="", tags="single")
+        self.p_avatar = self.canvas.create_oval(self.prod_pos[0]-36, self.prod_pos[1]-36, self.prod_pos[0]+36, self.prod_pos[1]+36, fill="#0d1117", tags="single")
+        self.p_icon = self.canvas.create_oval(self.prod_pos[0]-16, self.prod_pos[1]-16, self.prod_pos[0]+16, self.prod_pos[1]+16, fill=rgb_to_hex(NEON["producer_neon"]), tags="single")
 
-        self.c_glow = self.canvas.create_oval(self.cons_pos[0]-70, self.cons_pos[1]-70, self.cons_pos[0]+70, self.cons_pos[1]+70, fill="", outline="")
-        self.c_avatar = self.canvas.create_oval(self.cons_pos[0]-36, self.cons_pos[1]-36, self.cons_pos[0]+36, self.cons_pos[1]+36, fill="#0d1117")
-        self.c_icon = self.canvas.create_rectangle(self.cons_pos[0]-14, self.cons_pos[1]-12, self.cons_pos[0]+14, self.cons_pos[1]+12, fill=rgb_to_hex(NEON["consumer_neon"]))
+        self.c_glow = self.canvas.create_oval(self.cons_pos[0]-70, self.cons_pos[1]-70, self.cons_pos[0]+70, self.cons_pos[1]+70, fill="", outline="", tags="single")
+        self.c_avatar = self.canvas.create_oval(self.cons_pos[0]-36, self.cons_pos[1]-36, self.cons_pos[0]+36, self.cons_pos[1]+36, fill="#0d1117", tags="single")
+        self.c_icon = self.canvas.create_rectangle(self.cons_pos[0]-14, self.cons_pos[1]-12, self.cons_pos[0]+14, self.cons_pos[1]+12, fill=rgb_to_hex(NEON["consumer_neon"]), tags="single")
 
         # labels
-        self.canvas.create_text(self.prod_pos[0], self.prod_pos[1]+58, text="🏭  PRODUCER", fill=NEON["text"], font=("Segoe UI", 10, "bold"))
-        self.canvas.create_text(self.cons_pos[0], self.cons_pos[1]+58, text="🧺  CONSUMER", fill=NEON["text"], font=("Segoe UI", 10, "bold"))
+        self.canvas.create_text(self.prod_pos[0], self.prod_pos[1]+58, text="🏭  PRODUCER", fill=NEON["text"], font=("Segoe UI", 10, "bold"), tags="single")
+        self.canvas.create_text(self.cons_pos[0], self.cons_pos[1]+58, text="🧺  CONSUMER", fill=NEON["text"], font=("Segoe UI", 10, "bold"), tags="single")
 
         # buffer slots (only color changes; no inner item)
-        self.slot_rects = []
-        bx = 240; by = 200; w = 68; h = 44; gap = 18
-        for i in range(self.capacity):
-            x1 = bx + i*(w+gap)
-            rect = self.canvas.create_rectangle(x1, by, x1+w, by+h, fill=NEON["slot_empty"], outline="")
-            left = self.canvas.create_oval(x1-8, by, x1+16, by+h, fill=NEON["slot_empty"], outline="")
-            right = self.canvas.create_oval(x1+w-16, by, x1+w+8, by+h, fill=NEON["slot_empty"], outline="")
-            self.slot_rects.append((rect, left, right))
+        self.slot_view = SlotView(self.canvas)
+        self.slot_view.build(self.capacity)
+
+        # stage boxes + queue bars, shown instead of the above for the Pipeline runner
+        self.pipeline_view = PipelineView(self.canvas)
+
+    # -------------------------
+    # Latency histogram panel (produce→consume, log2 buckets)
+    # -------------------------
+    LAT_LO_BITS = 10    # first bar: < ~1 µs
+    LAT_HI_BITS = 34    # last bar: >= ~17 s
+
+    def build_latency_panel(self):
+        x0, y0, w, h = 20, 14, 720, 110
+        self.lat_box = (x0, y0, w, h)
+        self.canvas.create_rectangle(x0, y0, x0+w, y0+h, fill="#0F1318", outline="")
+        self.lat_text = self.canvas.create_text(x0+8, y0+10, anchor="w", fill=NEON["text"], font=("Consolas", 9),
+                                                text="Latency  p50 -  p90 -  p99 -  p99.9 -  max -")
+        n = self.LAT_HI_BITS - self.LAT_LO_BITS + 2
+        bw = (w - 16) / n
+        self.lat_bars = []
+        for i in range(n):
+            bx = x0 + 8 + i*bw
+            self.lat_bars.append(self.canvas.create_rectangle(bx, y0+h-12, bx+bw-2, y0+h-12, fill=rgb_to_hex(NEON["producer_neon"]), outline=""))
+        for label, bits in (("1µs", 10), ("1ms", 20), ("1s", 30)):
+            bx = x0 + 8 + (bits - self.LAT_LO_BITS + 1)*bw
+            self.canvas.create_text(bx, y0+h-5, text=label, fill=NEON["muted"], font=("Consolas", 7))
+
+    def update_latency(self):
+        hist = self.engine.latency.merged()     # one merge per refresh
+        snap = hist.snapshot()
+        x0, y0, w, h = self.lat_box
+        groups = hist.log2_counts(self.LAT_LO_BITS, self.LAT_HI_BITS)
+        top = max(groups) or 1
+        try:
+            self.canvas.itemconfig(self.lat_text, text=(
+                f"Latency (ms)  p50 {snap['p50']}  p90 {snap['p90']}  p99 {snap['p99']}  "
+                f"p99.9 {snap['p99.9']}  max {snap['max']}  n={snap['count']}"))
+            for bar, c in zip(self.lat_bars, groups):
+                bx1, _, bx2, _ = self.canvas.coords(bar)
+                self.canvas.coords(bar, bx1, y0+h-12 - (h-34)*c/top, bx2, y0+h-12)
+        except:
+            pass
 
     # -------------------------
     # Improved Log Panel (drop-in)
@@ -270,28 +727,26 @@ class FullSimulatorC:
         underline = tk.Frame(panel, bg=rgb_to_hex(NEON["producer_neon"]), height=2)
         underline.place(x=10, y=32, width=180)
 
-        # Log area
-        self.logbox = scrolledtext.ScrolledText(panel, width=52, height=18, bg="#0F1318", fg=NEON["text"], font=("Consolas", 10), insertbackground="white", bd=0, relief="flat")
-        self.logbox.place(x=10, y=45)
-
-        # tags for colors
-        self.logbox.tag_config("P", foreground=rgb_to_hex(NEON["producer_neon"]), font=("Consolas", 10, "bold"))
-        self.logbox.tag_config("C", foreground=rgb_to_hex(NEON["consumer_neon"]), font=("Consolas", 10, "bold"))
-        self.logbox.tag_config("S", foreground="#9AA0A6", font=("Consolas", 10))
-        self.logbox.tag_config("W", foreground=rgb_to_hex(NEON["warning"]), font=("Consolas", 10, "bold"))
+        # Log area: only the visible rows are real Tk text
+        log_frame = tk.Frame(panel, bg="#0F1318")
+        log_frame.place(x=10, y=45, width=430, height=300)
+        self.logview = LogView(log_frame, retention=self.LOG_RETENTION)
 
         # section headers inside log
-        self.logbox.insert(tk.END, "─── PRODUCER EVENTS ───\n", "P")
-        self.logbox.insert(tk.END, "─── CONSUMER EVENTS ───\n", "C")
-        self.logbox.insert(tk.END, "─── SYSTEM EVENTS ───\n", "S")
+        for tag, line in LOG_HEADERS:
+            self.logview.append(tag, line)
 
         # Thread states area
         tk.Label(panel, text="Thread States", bg=NEON["panel"], fg="#ffffff", font=("Segoe UI", 13, "bold")).place(x=10, y=355)
         underline2 = tk.Frame(panel, bg=rgb_to_hex(NEON["consumer_neon"]), height=2)
         underline2.place(x=10, y=378, width=200)
 
-        self.thread_frame = tk.Frame(panel, bg=NEON["panel"])
-        self.thread_frame.place(x=10, y=400)
+        thread_canvas = tk.Canvas(panel, bg=NEON["panel"], highlightthickness=0)
+        thread_canvas.place(x=10, y=386, width=414, height=90)
+        thread_scroll = ttk.Scrollbar(panel, orient="vertical")
+        thread_scroll.place(x=426, y=386, width=14, height=90)
+        self.thread_table = ThreadTable(thread_canvas, 414, 90)
+        self.thread_table.attach_scroll(thread_scroll, thread_canvas)
 
     # -------------------------
     # Timeline area
@@ -301,7 +756,11 @@ class FullSimulatorC:
         area.place(x=10, y=570, width=1220, height=130)
         tk.Label(area, text="Timeline (colored = running | grey = waiting)", bg=NEON["panel"], fg=NEON["text"]).place(x=10, y=6)
         self.timeline_canvas = tk.Canvas(area, bg="#0b0f12", highlightthickness=0)
-        self.timeline_canvas.place(x=10, y=30, width=1200, height=90)
+        self.timeline_canvas.place(x=10, y=30, width=1184, height=90)
+        timeline_scroll = ttk.Scrollbar(area, orient="vertical")
+        timeline_scroll.place(x=1196, y=30, width=14, height=90)
+        self.timeline = TimelineView(self.timeline_canvas, 90)
+        self.timeline.attach_scroll(timeline_scroll, self.timeline_canvas)
 
     # -------------------------
     # Glow animations
@@ -325,27 +784,8 @@ class FullSimulatorC:
         except:
             pass
 
-        # redraw timeline (simple)
-        self.timeline_canvas.delete("ev")
-        left = 80
-        for name, events in self.timeline_data.items():
-            y = self.track_positions.get(name, 6)
-            # subtle background stripe for each thread timeline row
-            self.timeline_canvas.create_rectangle(0, y, 1200, y+14, fill="#101418", outline="", tags="ev_bg")
-
-            evs = events[-40:]
-            x = left
-            for ev, ts in evs:
-                if ev == "Running":
-                    col = "#1ed760"
-                elif ev == "Waiting":
-                    col = "#f7d33e"
-                elif ev == "Stopped":
-                    col = "#9a9a9a"
-                else:
-                    col = "#444"
-                self.timeline_canvas.create_rectangle(x, y, x+16, y+12, fill=col, outline='', tags="ev")
-                x += 18
+        # only blocks that changed since the last frame are touched
+        self.timeline.render(self.engine.timeline_data)
 
         self.root.after(40, self.pulse_loop)
 
@@ -353,50 +793,99 @@ class FullSimulatorC:
     # Start / Stop / Reset
     # -------------------------
     def start(self):
-    if self.running:
-        # Inform the user if they click start again
-        self.log("S", "Simulation is already running")
-        return
+        if self.engine.running:
+            # Inform the user if they click start again
+            self.log("S", "Simulation is already running")
+            return
 
-        self.running = True
-                try:
+        try:
             self.start_btn.configure(state="disabled")
         except:
             pass
 
-        self.stop_event.clear()
         self.clear_log()
         self.log("S", "Simulation started")
 
         mode = self.mode_var.get()
         if mode == "Semaphore":
             self.log("S", "Semaphore mode activated")
-        try:
-            self.status_badge.configure(text="Mode: Semaphore", bg="#57a6ff")
-        except:
-            pass
+            try:
+                self.status_badge.configure(text="Mode: Semaphore", bg="#57a6ff")
+            except:
+                pass
 
-        self.buffer_model = MonitorBuffer(self.capacity) if mode == "Monitor" else SemaphoreBuffer(self.capacity)
+        try:
+            capacity = self.capacity_var.get()
+        except tk.TclError:
+            capacity = self.capacity
+        capacity = max(1, min(capacity, self.MAX_CAPACITY))
+        self.capacity_var.set(capacity)
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self.slot_view.build(capacity)
+        self.update_slots(0)
+
+        cls = ENGINES[self.runner_var.get()]
+        if type(self.engine) is not cls:
+            self.engine.unsubscribe(self.inbox.push)
+            self.engine = cls(capacity=self.capacity)
+            self.engine.subscribe(self.inbox.push)
+        pipeline = cls is PipelineEngine
+        if pipeline:
+            try:
+                stages = parse_stages(self.stages_var.get())
+            except ValueError as e:
+                self.log("W", str(e))
+                self.start_btn.configure(state="normal")
+                return
+            if sum(st.workers for st in stages) > self.MAX_THREADS:
+                self.log("W", f"Pipeline runner is limited to {self.MAX_THREADS} workers in total")
+                self.start_btn.configure(state="normal")
+                return
+            self.engine.stages = stages
+        self.show_pipeline(pipeline)
+
+        limit = {AsyncEngine: self.MAX_ACTORS, ProcessEngine: self.MAX_PROCESSES}.get(cls, self.MAX_THREADS)
+        producers, consumers = self.p_count.get(), self.c_count.get()
+        if max(producers, consumers) > limit:
+            self.log("W", f"{self.runner_var.get()} runner is limited to {limit} producers/consumers")
+            producers, consumers = min(producers, limit), min(consumers, limit)
+            self.p_count.set(producers)
+            self.c_count.set(consumers)
+
+        self.engine.mode = mode
+        self.engine.capacity = self.capacity
+        self.engine.producers = producers
+        self.engine.consumers = consumers
+        self.sync_settings()
+        try:
+            self.engine.start()
+        except ValueError as e:
+            self.log("W", str(e))
+            self.start_btn.configure(state="normal")
+            return
+        if pipeline:
+            self.pipeline_view.build(self.engine.stages, mode, self.capacity)
+        elif self.engine.buffer_mode != mode:
+            self.log("S", f"1 producer / 1 consumer: using the {self.engine.buffer_mode} fast path")
 
         self.setup_thread_ui()
-
-        self.threads = []
-        for i in range(self.p_count.get()):
-            t = threading.Thread(target=self.producer_worker, args=(i+1,), daemon=True)
-            t.start(); self.threads.append(t)
-        for j in range(self.c_count.get()):
-            t = threading.Thread(target=self.consumer_worker, args=(j+1,), daemon=True)
-            t.start(); self.threads.append(t)
-
         self.update_badge()
 
+    def sync_settings(self):
+        # Copy the live-editable Tk variables into the engine (GUI thread only)
+        try:
+            self.engine.prod_delay_ms = self.prod_speed.get()
+            self.engine.cons_delay_ms = self.cons_speed.get()
+            self.engine.batch_size = self.batch_size.get()
+        except tk.TclError:
+            pass    # half-typed entry; keep the previous values
+
     def stop(self):
-        if not self.running:
+        if not self.engine.stop():
             return
-            
-        self.stop_event.set()
-        self.running = False
-                try:
+
+        try:
             self.start_btn.configure(state="normal")
         except:
             pass
@@ -405,225 +894,108 @@ class FullSimulatorC:
         self.check_finished()
 
     def reset_all(self):
-        self.stop_event.set()
-        time.sleep(0.05)
+        self.engine.stop()
+        self.engine.join(timeout=0.5)
+        self.engine.reset()
         self.clear_log()
         self.clear_visuals()
         self.status_badge.configure(text="Status: Ready", bg=rgb_to_hex(NEON["badge_ok"]))
         self.done_badge.configure(text="")
-        self.produced_count = 0
-        self.consumed_count = 0
-        self.peak_buffer = 0
         self.update_counts()
-                try:
+        try:
             self.start_btn.configure(state="normal")
         except:
             pass
 
 
-    # -------------------------
-    # Producer / Consumer Workers
-    # -------------------------
-    def producer_worker(self, pid):
-        name = f"P{pid}"
-        self.thread_state_change(name, "Running")
-        item_id = 1
-        while not self.stop_event.is_set():
-            time.sleep(self.prod_speed.get()/1000.0 + random.uniform(0,0.25))
-            label = f"{name}-{item_id}"
-
-            self.gui_q.put(("log", "P", f"{name} trying to produce {label}"))
-            self.thread_state_change(name, "Waiting")
-
-            ok = self.buffer_model.produce(label, self.stop_event)
-            if not ok:
-                break
-
-            self.produced_count += 1
-            self.peak_buffer = max(self.peak_buffer, len(self.buffer_model.q))
-            self.update_counts()
-
-            # Instead of moving items, just update slot fills
-            self.gui_q.put(("log", "P", f"{name} produced {label}"))
-            self.gui_q.put(("slot_update", len(self.buffer_model.q)))
-            self.thread_state_change(name, "Running")
-            item_id += 1
-
-        self.thread_state_change(name, "Stopped")
-        self.gui_q.put(("log", "S", f"{name} stopped"))
-        self.check_finished()
-
-    def consumer_worker(self, cid):
-        name = f"C{cid}"
-        self.thread_state_change(name, "Running")
-        while not self.stop_event.is_set():
-            time.sleep(self.cons_speed.get()/1000.0 + random.uniform(0,0.45))
-            self.gui_q.put(("log", "C", f"{name} trying to consume"))
-            self.thread_state_change(name, "Waiting")
-
-            item = self.buffer_model.consume(self.stop_event)
-            if item is None:
-                break
-
-            self.consumed_count += 1
-            self.update_counts()
-
-            # update slots only
-            self.gui_q.put(("log", "C", f"{name} consumed {item}"))
-            self.gui_q.put(("slot_update", len(self.buffer_model.q)))
-            self.thread_state_change(name, "Running")
-
-        self.thread_state_change(name, "Stopped")
-        self.gui_q.put(("log", "S", f"{name} stopped"))
-        self.check_finished()
-
     # -------------------------
     # GUI queue processing
     # -------------------------
     def process_gui_queue(self):
-        processed = 0
-        while not self.gui_q.empty() and processed < 200:
-            try:
-                task = self.gui_q.get_nowait()
-            except queue.Empty:
-                break
-            processed += 1
-            cmd = task[0]
-            if cmd == "log":
-                _, tag, msg = task
-                self.log(tag, msg)
-            elif cmd == "slot_update":
-                _, n = task
-                self.update_slots(n)
-                self.update_badge()
-            elif cmd == "set_thread":
-                _, name, state = task
-                self.update_thread_label(name, state)
+        # one frame's worth of coalesced events, however fast the workers are
+        logs, states, slots, finished = self.inbox.drain()
+        for tag, msg in logs:
+            self.log(tag, msg)
+        if slots is not None:
+            self.update_slots(slots)
+            self.update_badge()
+        if states:
+            self.thread_table.update(states)
+        steals = self.engine.steal_counts()
+        if steals is not None:
+            self.thread_table.set_notes({name: f"stole {n}" for name, n in steals.items()})
+        if isinstance(self.engine, PipelineEngine) and self.engine.started_at is not None:
+            rows = self.engine.stage_stats()
+            self.pipeline_view.update(rows, self.engine.bottleneck(rows))
+        if finished:
+            self.check_finished()
+        self.logview.flush()
+        self.thread_table.flush()
+        self.sync_settings()
+        self.update_counts()
         self.root.after(40, self.process_gui_queue)
 
     # -------------------------
     # Logging
     # -------------------------
-def log(self, tag, msg):
-    # Shorter time + visible icon for each log type
-    ts = time.strftime("%H:%M:%S")
-    icon = {"P": "🟦", "C": "🟥", "S": "ℹ️", "W": "⚠️"}.get(tag, "•")
-    full_msg = f"{icon} [{ts}] {msg}"
-
-        try:
-            self.logbox.insert(tk.END, f"{full_msg}\n", tag)
-            
-            self.logbox.see(tk.END)
-        except:
-            self.logbox.insert(tk.END, f"{full_msg}\n")
-            self.logbox.see(tk.END)
+    def log(self, tag, msg):
+        # Shorter time + visible icon for each log type
+        ts = time.strftime("%H:%M:%S")
+        icon = {"P": "🟦", "C": "🟥", "S": "ℹ️", "W": "⚠️"}.get(tag, "•")
+        full_msg = f"{icon} [{ts}] {msg}"
+        # stored only; the visible window is redrawn once per process_gui_queue tick
+        self.logview.append(tag, full_msg)
 
     def clear_log(self):
-        try:
-            self.logbox.delete("1.0", tk.END)
-            # re-insert headers
-            self.logbox.insert(tk.END, "─── PRODUCER EVENTS ───\n", "P")
-            self.logbox.insert(tk.END, "─── CONSUMER EVENTS ───\n", "C")
-            self.logbox.insert(tk.END, "─── SYSTEM EVENTS ───\n", "S")
-        except:
-            pass
+        self.logview.clear()
+        # re-insert headers
+        for tag, line in LOG_HEADERS:
+            self.logview.append(tag, line)
 
     # -------------------------
     # Slot updates (ONLY color changes)
     # -------------------------
     def update_slots(self, n):
-    for i in range(self.capacity):
-        rect, l, r = self.slot_rects[i]
-        if i < n:
-            color = NEON["slot_fill"]
-        else:
-            color = NEON["slot_empty"]
+        self.slot_view.update(n)
+
+        # Update buffer usage label (a pipeline reports all of its queues together)
+        model = self.engine.buffer_model
+        capacity = model.capacity if model is not None else self.capacity
         try:
-            self.canvas.itemconfig(rect, fill=color)
-            self.canvas.itemconfig(l, fill=color)
-            self.canvas.itemconfig(r, fill=color)
+            if hasattr(self, "buffer_label"):
+                self.buffer_label.configure(text=f"Buffer: {n} / {capacity}")
         except:
             pass
 
-    # Update buffer usage label
-    try:
-        if hasattr(self, "buffer_label"):
-            self.buffer_label.configure(text=f"Buffer: {n} / {self.capacity}")
-    except:
-        pass
-
 
     # -------------------------
     # Thread UI & timeline
     # -------------------------
     def setup_thread_ui(self):
-        for child in self.thread_frame.winfo_children():
-            child.destroy()
-        self.thread_labels = {}
-        self.thread_states = {}
-
-        self.timeline_canvas.delete("all")
-        self.timeline_data.clear()
-        self.track_positions.clear()
-
-        y = 6
-        spacing = 18
-        for i in range(self.p_count.get()):
-            name = f"P{i+1}"
-            lbl = tk.Label(self.thread_frame, text=f"{name}: Ready", bg=NEON["panel"], fg=NEON["muted"], anchor="w")
-            lbl.pack(fill="x")
-            self.thread_labels[name] = lbl
-            self.thread_states[name] = "Ready"
-            self.timeline_canvas.create_text(10, y+6, text=name, fill=NEON["text"])
-            self.track_positions[name] = y
-            self.timeline_data[name] = []
-            y += spacing
-
-        for j in range(self.c_count.get()):
-            name = f"C{j+1}"
-            lbl = tk.Label(self.thread_frame, text=f"{name}: Ready", bg=NEON["panel"], fg=NEON["muted"], anchor="w")
-            lbl.pack(fill="x")
-            self.thread_labels[name] = lbl
-            self.thread_states[name] = "Ready"
-            self.timeline_canvas.create_text(10, y+6, text=name, fill=NEON["text"])
-            self.track_positions[name] = y
-            self.timeline_data[name] = []
-            y += spacing
-
-    def thread_state_change(self, name, state):
-        self.thread_states[name] = state
-        # record timeline event
-        now = time.time()
-        self.timeline_data.setdefault(name, []).append((state, now))
-        self.gui_q.put(("set_thread", name, state))
-
-    def update_thread_label(self, name, state):
-        lbl = self.thread_labels.get(name)
-        if not lbl:
-            return
-        color_map = {"Running":"#1ed760", "Waiting":"#f7d33e", "Stopped":"#9a9a9a"}
-        try:
-            lbl.configure(text=f"{name}: {state}", fg=color_map.get(state, NEON["muted"]))
-        except:
-            pass
+        # both views only create items for the rows that fit; the rest scroll in
+        names = self.engine.thread_names()
+        self.thread_table.set_threads(names)
+        self.timeline.set_tracks(names)
 
     # -------------------------
     # Badge / Counters / Finished
     # -------------------------
     def update_counts(self):
         try:
-            self.counts_label.configure(text=f"Produced: {self.produced_count}  Consumed: {self.consumed_count}  Peak: {self.peak_buffer}")
+            e = self.engine
+            self.counts_label.configure(text=f"Produced: {e.produced_count}  Consumed: {e.consumed_count}  Peak: {e.peak_buffer}")
         except:
             pass
+        self.update_latency()
 
     def update_badge(self):
-        if not hasattr(self, "buffer_model"):
+        if self.engine.buffer_model is None:
             status = "Ready"; color = NEON["badge_ok"]
         else:
-            n = len(self.buffer_model.q)
+            n = self.engine.buffer_len()
             if n == 0:
                 status = "Empty"; color = NEON["badge_ok"]
-            elif n == self.buffer_model.capacity:
+            elif n == self.engine.buffer_model.capacity:
                 status = "Full"; color = NEON["badge_bad"]
             else:
                 status = "Available"; color = NEON["badge_ok"]
@@ -634,10 +1006,11 @@ def log(self, tag, msg):
         self.update_counts()
 
     def check_finished(self):
-        if not hasattr(self, "thread_states"):
+        states = self.engine.thread_states
+        if not states:
             return
-        all_stopped = all(s == "Stopped" for s in self.thread_states.values())
-        buffer_empty = (len(self.buffer_model.q) == 0) if hasattr(self, "buffer_model") else True
+        all_stopped = all(s == "Stopped" for s in states.values())
+        buffer_empty = self.engine.buffer_len() == 0
         if all_stopped and buffer_empty:
             self.done_badge.configure(text="✔ Simulation Finished")
             self.log("S", "Simulation finished")
@@ -648,16 +1021,19 @@ def log(self, tag, msg):
     # Clear visuals
     # -------------------------
     def clear_visuals(self):
-        for i in range(self.capacity):
-            rect, l, r = self.slot_rects[i]
-            try:
-                self.canvas.itemconfig(rect, fill=NEON["slot_empty"])
-                self.canvas.itemconfig(l, fill=NEON["slot_empty"])
-                self.canvas.itemconfig(r, fill=NEON["slot_empty"])
-            except:
-                pass
-        self.timeline_canvas.delete("all")
-        self.timeline_data.clear()
+        self.update_slots(0)
+        self.timeline.clear()
+        self.pipeline_view.reset()
+
+    def show_pipeline(self, on):
+        # the Pipeline runner swaps the producer/buffer/consumer drawing for stage boxes
+        state = "hidden" if on else "normal"
+        try:
+            self.canvas.itemconfigure("single", state=state)
+            self.canvas.itemconfigure("slots", state=state)
+        except tk.TclError:
+            pass
+        self.pipeline_view.set_visible(on)
 
 # -------------------------
 # Run
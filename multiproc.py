@@ -0,0 +1,394 @@
+# multiproc.py
+"""
+Multiprocess version of the simulation engine.
+- Producers and consumers are separate processes (spawn), so they can run
+  on separate cores instead of sharing one GIL
+- SharedRingBuffer: fixed-size ring in multiprocessing.shared_memory with
+  process-shared empty/full/mutex semaphores, mirroring SemaphoreBuffer
+- Workers stream state, timeline and counter messages back over a queue;
+  a pump thread in the parent republishes them as the usual event stream
+"""
+
+import multiprocessing as mp
+import queue, struct, threading, time
+from multiprocessing import shared_memory
+
+from buffers import acquire_many
+from engine import SimulationEngine
+from schedule import DelaySchedule
+
+# Shared header fields (int64 each)
+HEAD, TAIL, STOPPED, CLAIMED = range(4)
+FIELD = struct.Struct("<q")
+HEADER_SIZE = 4 * FIELD.size
+# One slot: producer number, item number, enqueue time (monotonic ns)
+SLOT = struct.Struct("<IIq")
+
+
+def attach_shared_memory(name):
+    """Open an existing block from a worker process.
+
+    Spawned workers share the parent's resource tracker, so the block stays
+    registered once and is released by the parent's unlink().
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)     # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRingBuffer:
+    """SemaphoreBuffer over a ring in shared memory, usable from several processes.
+
+    Items are (producer number, item number, enqueue ns) triples packed into
+    fixed 16-byte slots. The creating process owns the block and unlinks it
+    in close(); worker processes receive the buffer as a Process argument
+    and attach by name.
+    """
+    def __init__(self, capacity, ctx=None):
+        ctx = ctx or mp.get_context()
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * SLOT.size)
+        self.buf = self.shm.buf
+        self.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self.owner = True
+        self.empty = ctx.Semaphore(capacity)
+        self.full = ctx.Semaphore(0)
+        self.mutex = ctx.Semaphore(1)
+        self.claim_lock = ctx.Lock()
+
+    def __getstate__(self):
+        return (self.shm.name, self.capacity, self.empty, self.full, self.mutex, self.claim_lock)
+
+    def __setstate__(self, state):
+        name, self.capacity, self.empty, self.full, self.mutex, self.claim_lock = state
+        self.shm = attach_shared_memory(name)
+        self.buf = self.shm.buf
+        self.owner = False
+
+    def get(self, field):
+        return FIELD.unpack_from(self.buf, field * FIELD.size)[0]
+
+    def set(self, field, value):
+        FIELD.pack_into(self.buf, field * FIELD.size, value)
+
+    def __len__(self):
+        # lock-free estimate; head may move between the two reads
+        head = self.get(HEAD)
+        return max(0, min(self.capacity, self.get(TAIL) - head))
+
+    @property
+    def stopped(self):
+        return self.get(STOPPED) != 0
+
+    def _acquire_many(self, sem, max_n, timeout=None):
+        return acquire_many(sem, max_n, lambda: self.stopped, timeout)
+
+    def produce_many(self, items, timeout=None):
+        """Move up to len(items) items with one mutex hold; returns how many moved."""
+        n = self._acquire_many(self.empty, len(items), timeout)
+        if n == 0:
+            return 0
+        with self.mutex:
+            tail = self.get(TAIL)
+            for i in range(n):
+                SLOT.pack_into(self.buf, HEADER_SIZE + (tail + i) % self.capacity * SLOT.size, *items[i])
+            self.set(TAIL, tail + n)
+        for _ in range(n):
+            self.full.release()
+        return n
+
+    def consume_many(self, max_n, timeout=None):
+        """Take up to `max_n` items with one mutex hold; returns the list taken."""
+        n = self._acquire_many(self.full, max_n, timeout)
+        if n == 0:
+            return []
+        with self.mutex:
+            head = self.get(HEAD)
+            n = min(n, self.get(TAIL) - head)
+            items = [SLOT.unpack_from(self.buf, HEADER_SIZE + (head + i) % self.capacity * SLOT.size) for i in range(n)]
+            self.set(HEAD, head + n)
+        for _ in range(len(items)):
+            self.empty.release()
+        return items
+
+    def claim(self, n, max_items):
+        """Reserve up to `n` item ids against max_items across all processes."""
+        if max_items is None:
+            return n
+        with self.claim_lock:
+            claimed = self.get(CLAIMED)
+            n = max(0, min(n, max_items - claimed))
+            self.set(CLAIMED, claimed + n)
+            return n
+
+    def stop(self):
+        self.set(STOPPED, 1)
+        self.empty.release()
+        self.full.release()
+
+    def close(self):
+        self.final_len = len(self)     # what len() readers get after the view is gone
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# -------------------------
+# Worker processes
+# -------------------------
+class Outbox:
+    """Batches a worker's messages so each queue put carries many of them."""
+    FLUSH_S = 0.02      # keeps the GUI live: at most 20 ms behind
+    MAX_BATCH = 256
+
+    def __init__(self, events):
+        self.events = events
+        self.pending = []
+        self.last = time.monotonic()
+
+    def put(self, msg):
+        self.pending.append(msg)
+        if len(self.pending) >= self.MAX_BATCH or time.monotonic() - self.last >= self.FLUSH_S:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.events.put(self.pending)
+            self.pending = []
+        self.last = time.monotonic()
+
+
+# Messages sent to the parent (in lists, see Outbox):
+#   ("state", name, state, ts)
+#   ("log", tag, msg)                                only when cfg["verbose"]
+#   ("produced", n, wait_s, occupancy)
+#   ("consumed", n, wait_s, occupancy, latencies_ns)
+#   ("exit", name, recorded_delays or None)
+
+def worker_main(role, idx, cfg, buf, events, stop):
+    name = f"{role}{idx}"
+    schedule = DelaySchedule(cfg["seed"], record=cfg["record"], replay=cfg["replay"])
+    think = schedule.stream(name)
+    events = Outbox(events)
+    verbose = cfg["verbose"]
+    batch_size = max(1, cfg["batch_size"])
+
+    # Try without blocking first; flush pending messages before blocking so
+    # the parent is never waiting on counts held back in this worker.
+    def put_items(items):
+        moved = buf.produce_many(items, timeout=0)
+        if moved == 0 and not buf.stopped:
+            events.flush()
+            moved = buf.produce_many(items)
+        return moved
+
+    def take_items(n):
+        items = buf.consume_many(n, timeout=0)
+        if not items and not buf.stopped:
+            events.flush()
+            items = buf.consume_many(n)
+        return items
+
+    def pause(delay):
+        if delay > 0:
+            events.flush()
+        return stop.wait(delay)
+
+    try:
+        events.put(("state", name, "Running", time.time()))
+        if role == "P":
+            item_id = 1
+            while not stop.is_set():
+                batch = buf.claim(batch_size, cfg["max_items"])
+                if batch == 0:
+                    break
+                if pause(think.next(cfg["prod_delay_ms"]/1000.0, cfg["prod_jitter"], batch)):
+                    break
+                if verbose:
+                    desc = f"{name}-{item_id}" if batch == 1 else f"{name}-{item_id}..{name}-{item_id + batch - 1}"
+                    events.put(("log", "P", f"{name} trying to produce {desc}"))
+                events.put(("state", name, "Waiting", time.time()))
+                sent = 0
+                t0 = time.perf_counter()
+                now_ns = time.monotonic_ns()
+                items = [(idx, item_id + k, now_ns) for k in range(batch)]
+                while sent < batch:
+                    moved = put_items(items[sent:])
+                    if moved == 0:
+                        break
+                    sent += moved
+                events.put(("produced", sent, time.perf_counter() - t0, len(buf)))
+                if sent < batch:
+                    break
+                if verbose:
+                    events.put(("log", "P", f"{name} produced {desc}"))
+                events.put(("state", name, "Running", time.time()))
+                item_id += batch
+        else:
+            while not stop.is_set():
+                if pause(think.next(cfg["cons_delay_ms"]/1000.0, cfg["cons_jitter"], batch_size)):
+                    break
+                if verbose:
+                    events.put(("log", "C", f"{name} trying to consume"))
+                events.put(("state", name, "Waiting", time.time()))
+                t0 = time.perf_counter()
+                items = take_items(batch_size)
+                wait = time.perf_counter() - t0
+                if not items:
+                    break
+                now_ns = time.monotonic_ns()
+                events.put(("consumed", len(items), wait, len(buf), [now_ns - enq for _, _, enq in items]))
+                if verbose:
+                    first, last = items[0], items[-1]
+                    desc = f"P{first[0]}-{first[1]}" if len(items) == 1 else f"P{first[0]}-{first[1]}..P{last[0]}-{last[1]} ({len(items)} items)"
+                    events.put(("log", "C", f"{name} consumed {desc}"))
+                events.put(("state", name, "Running", time.time()))
+    finally:
+        events.put(("state", name, "Stopped", time.time()))
+        events.put(("exit", name, think.record))
+        events.flush()
+        buf.close()
+
+
+class ProcessEngine(SimulationEngine):
+    """Runs each producer and consumer in its own process over a SharedRingBuffer.
+
+    Only the Semaphore model is available (process-shared semaphores).
+    Settings are copied to the workers at start(), so changing delays
+    while running has no effect until the next run. A pump thread turns
+    worker messages into counters, timeline entries and the usual events.
+    """
+    verbose = None      # set by run(): whether anyone besides run() itself listens
+
+    def resolve_mode(self):
+        if self.mode != "Semaphore":
+            raise ValueError(f"process runs support Semaphore only, not {self.mode!r}")
+        return self.mode
+
+    def run(self, duration=None, max_items=None):
+        # decide before run() subscribes its own "finished" waiter, which
+        # would otherwise make every headless run ship its log lines
+        self.verbose = bool(self.subscribers)
+        try:
+            return super().run(duration, max_items)
+        finally:
+            self.verbose = None
+
+    def start(self):
+        if self.running:
+            return False
+        mode = self.resolve_mode()
+        self.running = True
+        self.stop_event.clear()
+        self.reset()
+        self.buffer_mode = mode
+        self.delays = self.make_schedule()
+        ctx = mp.get_context("spawn")
+        # buffer_len() runs on the GUI thread while the pump closes the shared memory
+        self._close_lock = threading.Lock()
+        self.buffer_model = SharedRingBuffer(self.capacity, ctx)
+        self.events = ctx.Queue()
+        self.proc_stop = ctx.Event()
+        for name in self.thread_names():
+            self.thread_states[name] = "Ready"
+            self.timeline_data.track(name)
+        cfg = {
+            "seed": self.delays.seed,
+            "record": self.record_delays is not None,
+            "replay": self.delays.replay,       # name -> delays; each worker picks its own
+            "verbose": bool(self.subscribers) if self.verbose is None else self.verbose,
+            "batch_size": self.batch_size,
+            "max_items": self.max_items,
+            "prod_delay_ms": self.prod_delay_ms,
+            "cons_delay_ms": self.cons_delay_ms,
+            "prod_jitter": self.prod_jitter,
+            "cons_jitter": self.cons_jitter,
+        }
+        self.procs = []
+        for role, count in (("P", self.producers), ("C", self.consumers)):
+            for i in range(count):
+                p = ctx.Process(target=worker_main, args=(role, i+1, cfg, self.buffer_model, self.events, self.proc_stop),
+                                name=f"{role}{i+1}", daemon=True)
+                self.procs.append(p)
+        self.started_at = time.perf_counter()
+        for p in self.procs:
+            p.start()
+        pump = threading.Thread(target=self.pump, name="process-pump", daemon=True)
+        self.threads = [pump]
+        pump.start()
+        return True
+
+    def stop(self):
+        if not self.begin_stop():
+            return False
+        self.proc_stop.set()
+        with self._close_lock:
+            if self.buffer_model.buf is not None:
+                self.buffer_model.stop()
+        return True
+
+    def pump(self):
+        alive = len(self.procs)
+        while alive:
+            try:
+                batch = self.events.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.procs):
+                    break       # a worker died without saying goodbye
+                continue
+            alive -= self.dispatch(batch)
+        for p in self.procs:
+            p.join()
+        with self._close_lock:
+            self.buffer_model.close()
+        self.running = False
+        if self.stopped_at is None:
+            self.stopped_at = time.perf_counter()
+        self.emit("finished")
+
+    def dispatch(self, batch):
+        """Apply one batch of worker messages; returns how many workers exited."""
+        exited = 0
+        for msg in batch:
+            kind = msg[0]
+            if kind == "state":
+                _, name, state, ts = msg
+                self.thread_states[name] = state
+                self.timeline_data.record(name, state, ts)
+                self.emit("set_thread", name, state)
+                if state == "Stopped":
+                    self.emit("log", "S", f"{name} stopped")
+            elif kind == "log":
+                self.emit(*msg)
+            elif kind == "produced":
+                _, n, wait, occupancy = msg
+                self.record_wait("produce", wait)
+                self.produced.add(n)
+                self.peak.update(occupancy)
+                self.emit("slot_update", occupancy)
+            elif kind == "consumed":
+                _, n, wait, occupancy, latencies = msg
+                self.record_wait("consume", wait)
+                for ns in latencies:
+                    self.latency.record(ns)
+                done = self.count_consumed(n)
+                self.emit("slot_update", occupancy)
+                if done:
+                    self.stop()
+            elif kind == "exit":
+                _, name, record = msg
+                if record is not None:
+                    self.delays.recorded[name] = record
+                exited += 1
+        return exited
+
+    def buffer_len(self):
+        model = self.buffer_model
+        if model is None:
+            return 0
+        with self._close_lock:
+            if model.buf is None:
+                return model.final_len
+            return len(model)
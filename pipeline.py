@@ -0,0 +1,319 @@
+# pipeline.py
+"""
+Multi-stage pipeline topology: source → stage → ... → sink.
+- Stage: a worker pool, a service-time distribution and the bounded
+  queue (Monitor or Semaphore) in front of it
+- PipelineEngine runs every stage's workers over the chain of queues and
+  reports per-stage throughput, utilization and queue depth
+- The bottleneck is picked automatically: the busiest stage
+"""
+
+import threading, time
+
+from buffers import make_buffer
+from engine import SimulationEngine
+from stats import ShardedCounter, ShardedMax
+
+PIPELINE_MODES = ("Monitor", "Semaphore")
+DISTRIBUTIONS = ("const", "uniform", "exp")
+
+
+class Stage:
+    """One pipeline stage: `workers` threads, each spending a service time per item.
+
+    `service_ms` is the mean service time; `dist` is "const", "uniform"
+    (0..2x the mean) or "exp". `mode` and `capacity` describe the queue in
+    front of the stage (None = the engine's mode/capacity); the first stage
+    is the source and has no input queue.
+    """
+    def __init__(self, name, workers=1, service_ms=100.0, dist="uniform", mode=None, capacity=None):
+        if workers < 1:
+            raise ValueError(f"stage {name}: needs at least one worker")
+        if service_ms < 0:
+            raise ValueError(f"stage {name}: service time must be >= 0")
+        if dist not in DISTRIBUTIONS:
+            raise ValueError(f"stage {name}: unknown distribution {dist!r} (use {', '.join(DISTRIBUTIONS)})")
+        if mode is not None and mode not in PIPELINE_MODES:
+            raise ValueError(f"stage {name}: pipeline queues are {' or '.join(PIPELINE_MODES)}, not {mode!r}")
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"stage {name}: queue capacity must be at least 1")
+        self.name = name
+        self.workers = workers
+        self.service_ms = service_ms
+        self.dist = dist
+        self.mode = mode
+        self.capacity = capacity
+
+    def draw(self, rng):
+        """One service time in seconds."""
+        mean = self.service_ms / 1000.0
+        if self.dist == "const" or mean == 0:
+            return mean
+        if self.dist == "uniform":
+            return rng.uniform(0, 2 * mean)
+        return rng.expovariate(1.0 / mean)
+
+    def max_rate(self):
+        """Items/s the stage could sustain if never blocked (None for zero service time)."""
+        return self.workers / (self.service_ms / 1000.0) if self.service_ms > 0 else None
+
+    def spec(self):
+        parts = [str(self.workers), f"{self.service_ms:g}", self.dist]
+        if self.mode is not None:
+            parts.append(self.mode)
+        if self.capacity is not None:
+            parts.append(str(self.capacity))
+        return ":".join(parts)
+
+
+def parse_stages(text):
+    """Stages from "WORKERS:SERVICE_MS[:DIST][:MODE][:CAPACITY],...".
+
+    e.g. "2:300,4:450:exp:Semaphore:8,1:100" is a 2-worker source, a
+    4-worker middle stage fed by an 8-slot Semaphore queue and a 1-worker
+    sink. The optional fields may come in any order; stages are named
+    S1..Sn. Raises ValueError on malformed input.
+    """
+    stages = []
+    for i, chunk in enumerate(c.strip() for c in text.split(",") if c.strip()):
+        name = f"S{i+1}"
+        fields = chunk.split(":")
+        if len(fields) < 2:
+            raise ValueError(f"stage {name}: expected WORKERS:SERVICE_MS, got {chunk!r}")
+        try:
+            workers, service_ms = int(fields[0]), float(fields[1])
+        except ValueError:
+            raise ValueError(f"stage {name}: expected WORKERS:SERVICE_MS, got {chunk!r}") from None
+        opts = {}
+        for f in fields[2:]:
+            if f in DISTRIBUTIONS:
+                opts["dist"] = f
+            elif f in PIPELINE_MODES:
+                opts["mode"] = f
+            elif f.isdigit():
+                opts["capacity"] = int(f)
+            else:
+                raise ValueError(f"stage {name}: unknown field {f!r}")
+        stages.append(Stage(name, workers, service_ms, **opts))
+    if len(stages) < 2:
+        raise ValueError("a pipeline needs at least two stages (source and sink)")
+    return stages
+
+
+def default_stages():
+    return [Stage("S1", 2, 300), Stage("S2", 3, 450), Stage("S3", 1, 200)]
+
+
+class StageCounters:
+    """Per-thread-sharded counters for one stage."""
+    def __init__(self):
+        self.processed = ShardedCounter()
+        self.busy_ns = ShardedCounter()     # service time spent, excluding blocking
+        self.depth_sum = ShardedCounter()   # input-queue depth seen at each take
+        self.depth_n = ShardedCounter()
+        self.depth_peak = ShardedMax()
+
+
+class QueueChain:
+    """The pipeline's queues seen as one buffer: len/capacity are totals, stop() stops all."""
+    def __init__(self, queues):
+        self.queues = queues
+        self.capacity = sum(q.capacity for q in queues)
+
+    def __len__(self):
+        return sum(len(q) for q in self.queues)
+
+    def stop(self):
+        for q in self.queues:
+            q.stop()
+
+
+class PipelineEngine(SimulationEngine):
+    """Runs a chain of stages, each with its own worker pool and input queue.
+
+    The first stage generates items (max_items is claimed there), every
+    later stage takes from the queue in front of it, spends its service
+    time and passes the item on; the last stage is the sink and records
+    end-to-end latency. producers/consumers mirror the first and last
+    stage's worker counts; `mode` and `capacity` are the defaults for
+    queues that do not set their own. Per-stage figures come from
+    stage_stats(), and bottleneck() names the stage with the highest
+    utilization (busy time / (workers x elapsed)).
+    """
+    def __init__(self, stages=None, **kwargs):
+        self.stages = stages or default_stages()
+        super().__init__(**kwargs)
+        self.producers = self.stages[0].workers
+        self.consumers = self.stages[-1].workers
+
+    def thread_names(self):
+        return [f"{st.name}.{i+1}" for st in self.stages for i in range(st.workers)]
+
+    def resolve_mode(self):
+        if len(self.stages) < 2:
+            raise ValueError("a pipeline needs at least two stages (source and sink)")
+        if self.mode not in PIPELINE_MODES:
+            raise ValueError(f"pipeline queues are {' or '.join(PIPELINE_MODES)}, not {self.mode!r}")
+        return "Pipeline"
+
+    def reset(self):
+        super().reset()
+        self.counters = [StageCounters() for _ in self.stages]
+        self.queues = []
+
+    def start(self):
+        if self.running:
+            return False
+        mode = self.resolve_mode()
+        self.running = True
+        self.stop_event.clear()
+        self.reset()
+        self.buffer_mode = mode
+        self.delays = self.make_schedule()
+        self.producers = self.stages[0].workers
+        self.consumers = self.stages[-1].workers
+        self.queues = [make_buffer(st.mode or self.mode, st.capacity or self.capacity, metrics=self.metrics)
+                       for st in self.stages[1:]]
+        self.buffer_model = QueueChain(self.queues)
+        for name in self.thread_names():
+            self.thread_states[name] = "Ready"
+            self.timeline_data.track(name)
+
+        self.threads = []
+        self._alive = sum(st.workers for st in self.stages)
+        self.started_at = time.perf_counter()
+        for k, st in enumerate(self.stages):
+            for i in range(st.workers):
+                t = threading.Thread(target=self.stage_worker, args=(k, i+1), name=f"{st.name}.{i+1}", daemon=True)
+                t.start(); self.threads.append(t)
+        return True
+
+    # -------------------------
+    # Stage workers
+    # -------------------------
+    def stage_worker(self, k, wid):
+        st = self.stages[k]
+        name = f"{st.name}.{wid}"
+        counters = self.counters[k]
+        inq = self.queues[k-1] if k > 0 else None
+        outq = self.queues[k] if k < len(self.queues) else None
+        think = self.delays.stream(name)
+        self.thread_state_change(name, "Running")
+        item_id = 1
+        while not self.stop_event.is_set():
+            batch = max(1, self.batch_size)
+            if inq is None:
+                n = self.claim_items(batch)
+                if n == 0:
+                    break
+            else:
+                self.thread_state_change(name, "Waiting")
+                t0 = time.perf_counter()
+                items, depth = inq.consume_many(batch)
+                self.record_wait("consume", time.perf_counter() - t0)
+                if not items:
+                    break
+                n = len(items)
+                counters.depth_sum.add(depth)
+                counters.depth_n.add(1)
+                self.thread_state_change(name, "Running")
+
+            delay = think.sample(lambda rng: sum(st.draw(rng) for _ in range(n)))
+            if self.stop_event.wait(delay):
+                break
+            counters.busy_ns.add(int(delay * 1e9))
+            counters.processed.add(n)
+
+            if inq is None:
+                now_ns = time.monotonic_ns()
+                items = [(f"{name}-{item_id + j}", now_ns) for j in range(n)]
+                item_id += n
+            desc = items[0][0] if n == 1 else f"{items[0][0]}..{items[-1][0]} ({n} items)"
+
+            if outq is None:
+                # sink: the item leaves the pipeline
+                now_ns = time.monotonic_ns()
+                for _, enq_ns in items:
+                    self.latency.record(now_ns - enq_ns)
+                done = self.count_consumed(n)
+                self.emit("log", "C", f"{name} finished {desc}")
+                self.emit("slot_update", self.buffer_len())
+                if done:
+                    self.stop()
+                continue
+
+            self.emit("log", "P" if inq is None else "C", f"{name} passing {desc} to {self.stages[k+1].name}")
+            self.thread_state_change(name, "Waiting")
+            sent = peak = 0
+            t0 = time.perf_counter()
+            while sent < n:
+                moved, depth = outq.produce_many(items[sent:])
+                if moved == 0:
+                    break
+                sent += moved
+                peak = max(peak, depth)
+            self.record_wait("produce", time.perf_counter() - t0)
+            if sent < n:
+                break
+            self.counters[k+1].depth_peak.update(peak)
+            if inq is None:
+                self.produced.add(sent)
+            total = self.buffer_len()
+            self.peak.update(total)
+            self.emit("slot_update", total)
+            self.thread_state_change(name, "Running")
+
+        self.worker_exit(name)
+
+    # -------------------------
+    # Per-stage results
+    # -------------------------
+    def stage_stats(self):
+        """One dict per stage: throughput (items/s), utilization and input-queue depth."""
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            end = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+            elapsed = end - self.started_at
+        rows = []
+        for k, (st, c) in enumerate(zip(self.stages, self.counters)):
+            processed = c.processed.value()
+            busy = c.busy_ns.value() / 1e9
+            q = self.queues[k-1] if 0 < k <= len(self.queues) else None
+            takes = c.depth_n.value()
+            rate = st.max_rate()
+            rows.append({
+                "stage": st.name,
+                "workers": st.workers,
+                "service_ms": st.service_ms,
+                "dist": st.dist,
+                "queue_mode": (st.mode or self.mode) if k > 0 else None,
+                "queue_capacity": (st.capacity or self.capacity) if k > 0 else None,
+                "processed": processed,
+                "throughput": round(processed / elapsed, 3) if elapsed > 0 else 0.0,
+                "utilization": round(min(1.0, busy / (st.workers * elapsed)), 3) if elapsed > 0 else 0.0,
+                "max_rate": round(rate, 3) if rate is not None else None,
+                "queue_depth": len(q) if q is not None else None,
+                "queue_depth_mean": round(c.depth_sum.value() / takes, 3) if takes else (0.0 if k > 0 else None),
+                "queue_peak": c.depth_peak.value() if k > 0 else None,
+            })
+        return rows
+
+    def bottleneck(self, rows=None):
+        """Name of the busiest stage (ties: lowest max_rate), or None before any work."""
+        rows = self.stage_stats() if rows is None else rows
+        if not any(r["processed"] for r in rows):
+            return None
+        inf = float("inf")
+        best = max(rows, key=lambda r: (r["utilization"], -(r["max_rate"] if r["max_rate"] is not None else inf)))
+        return best["stage"]
+
+    def results(self):
+        res = super().results()
+        for key in ("prod_delay_ms", "cons_delay_ms"):
+            res.pop(key, None)
+        rows = self.stage_stats()
+        res["pipeline"] = ",".join(st.spec() for st in self.stages)
+        res["bottleneck"] = self.bottleneck(rows)
+        res["stages"] = rows
+        return res
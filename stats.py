@@ -0,0 +1,186 @@
+# stats.py
+"""
+Small statistics helpers for simulation results.
+- LatencyHistogram: fixed-size log-bucketed histogram for item latencies
+- ShardedHistogram: one LatencyHistogram per thread, merged on read
+- ShardedCounter / ShardedMax: per-thread cells merged on read
+"""
+
+import math, threading
+
+class ShardedCounter:
+    """Counter whose increments touch only the calling thread's own cell.
+
+    Each thread gets a private one-slot list the first time it adds (the
+    only moment a lock is taken); value() sums every cell. Only the owning
+    thread ever writes a cell, so counts stay exact without a shared lock
+    on the hot path, with or without the GIL.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cells = []
+        self.local = threading.local()
+
+    def cell(self):
+        try:
+            return self.local.cell
+        except AttributeError:
+            c = self.local.cell = [0]
+            with self.lock:
+                self.cells.append(c)
+            return c
+
+    def add(self, n=1):
+        self.cell()[0] += n
+
+    def value(self):
+        with self.lock:
+            cells = list(self.cells)
+        return sum(c[0] for c in cells)
+
+
+class ShardedMax(ShardedCounter):
+    """High-water mark with one cell per thread; value() is the max over cells."""
+    def update(self, v):
+        c = self.cell()
+        if v > c[0]:
+            c[0] = v
+
+    def value(self):
+        with self.lock:
+            cells = list(self.cells)
+        return max((c[0] for c in cells), default=0)
+
+
+class LatencyHistogram:
+    """Compact log-bucketed latency histogram (HDR-style), values in ns.
+
+    Each power of two is split into 32 linear sub-buckets, so any recorded
+    value is reported within ~3% using a fixed array of counters
+    regardless of how many samples are added. Thread-safe.
+    """
+    SUB_BITS = 5
+    SUB = 1 << SUB_BITS
+    MAX_BITS = 48       # ~78 hours in ns; larger values land in the last bucket
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = [0] * ((self.MAX_BITS - self.SUB_BITS + 1) * self.SUB)
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    @classmethod
+    def index_of(cls, v):
+        if v < 2 * cls.SUB:
+            return v
+        shift = v.bit_length() - (cls.SUB_BITS + 1)
+        return (shift + 1) * cls.SUB + (v >> shift) - cls.SUB
+
+    @classmethod
+    def upper_of(cls, idx):
+        # largest value that maps to bucket idx
+        if idx < 2 * cls.SUB:
+            return idx
+        shift = idx // cls.SUB - 1
+        m = idx % cls.SUB + cls.SUB
+        return ((m + 1) << shift) - 1
+
+    def record(self, v):
+        v = max(0, int(v))
+        idx = min(self.index_of(v), len(self.counts) - 1)
+        with self.lock:
+            self.counts[idx] += 1
+            self.total += 1
+            self.sum += v
+            if v > self.max:
+                self.max = v
+
+    def merge(self, other):
+        with other.lock:
+            counts, total, s, mx = list(other.counts), other.total, other.sum, other.max
+        with self.lock:
+            for i, c in enumerate(counts):
+                if c:
+                    self.counts[i] += c
+            self.total += total
+            self.sum += s
+            self.max = max(self.max, mx)
+
+    def value_at(self, q):
+        """Value (ns) at percentile q (0..100); reported as the bucket's upper edge."""
+        with self.lock:
+            if self.total == 0:
+                return 0
+            rank = max(1, math.ceil(q / 100.0 * self.total))
+            seen = 0
+            for idx, c in enumerate(self.counts):
+                seen += c
+                if seen >= rank:
+                    return min(self.upper_of(idx), self.max)
+            return self.max
+
+    def log2_counts(self, lo_bits, hi_bits):
+        """Counts grouped per power of two: [<2^lo_bits, 2^lo..2^(lo+1), ..., >=2^hi_bits]."""
+        groups = [0] * (hi_bits - lo_bits + 2)
+        with self.lock:
+            for idx, c in enumerate(self.counts):
+                if c:
+                    bits = self.upper_of(idx).bit_length()
+                    groups[min(max(bits - lo_bits, 0), len(groups) - 1)] += c
+        return groups
+
+    def snapshot(self):
+        """Summary in milliseconds: count, mean, p50/p90/p99/p99.9 and max."""
+        ms = 1e-6
+        return {
+            "count": self.total,
+            "mean": round(self.sum / self.total * ms, 3) if self.total else 0.0,
+            "p50": round(self.value_at(50) * ms, 3),
+            "p90": round(self.value_at(90) * ms, 3),
+            "p99": round(self.value_at(99) * ms, 3),
+            "p99.9": round(self.value_at(99.9) * ms, 3),
+            "max": round(self.max * ms, 3),
+        }
+
+
+class ShardedHistogram:
+    """LatencyHistogram with one cell per recording thread, merged on read.
+
+    record() only touches the calling thread's own histogram, so its lock
+    is never contended by other writers; merged() folds every cell into a
+    fresh LatencyHistogram for reporting.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cells = []
+        self.local = threading.local()
+
+    def cell(self):
+        try:
+            return self.local.cell
+        except AttributeError:
+            c = self.local.cell = LatencyHistogram()
+            with self.lock:
+                self.cells.append(c)
+            return c
+
+    def record(self, v):
+        self.cell().record(v)
+
+    def merged(self):
+        with self.lock:
+            cells = list(self.cells)
+        total = LatencyHistogram()
+        for c in cells:
+            total.merge(c)
+        return total
+
+    def value_at(self, q):
+        return self.merged().value_at(q)
+
+    def log2_counts(self, lo_bits, hi_bits):
+        return self.merged().log2_counts(lo_bits, hi_bits)
+
+    def snapshot(self):
+        return self.merged().snapshot()
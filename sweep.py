@@ -0,0 +1,138 @@
+# sweep.py
+"""
+Parallel parameter sweeps over a process pool.
+- Expands a grid of mode × producers × consumers × capacity × delay profile
+- Runs every point headless in a ProcessPoolExecutor (all cores by default)
+- Streams each result row into one CSV table as soon as it finishes
+- Points already present in the output file are skipped, so an
+  interrupted sweep resumes where it stopped
+"""
+
+import csv, itertools, os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from buffers import SINGLE_PAIR_MODELS
+from engine import SimulationEngine
+from virtual import VirtualEngine
+
+
+def parse_int_list(text):
+    """'1,2,4' or '1-8' or '1-4,16,32' -> sorted list of ints."""
+    values = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            values.update(range(int(lo), int(hi) + 1))
+        else:
+            values.add(int(part))
+    return sorted(values)
+
+
+def parse_delay_profile(text):
+    """'PROD_MS/CONS_MS' or 'PROD_MS/CONS_MS/PROD_JITTER_MS/CONS_JITTER_MS' -> dict."""
+    parts = [float(p) for p in text.split("/")]
+    if len(parts) == 2:
+        parts += [0.0, 0.0]
+    if len(parts) != 4:
+        raise ValueError(f"bad delay profile {text!r}; expected P/C or P/C/PJ/CJ (ms)")
+    return {"prod_delay_ms": parts[0], "cons_delay_ms": parts[1],
+            "prod_jitter_ms": parts[2], "cons_jitter_ms": parts[3]}
+
+
+def expand_grid(modes, producers, consumers, capacities, delays, seed=None, batch_size=1):
+    """Every grid point; single-pair modes (SPSC) only get their 1P1C points."""
+    points = []
+    for mode, p, c, cap, d in itertools.product(modes, producers, consumers, capacities, delays):
+        if mode in SINGLE_PAIR_MODELS and (p, c) != (1, 1):
+            continue
+        cfg = {"mode": mode, "producers": p, "consumers": c, "capacity": cap, "batch_size": batch_size, "seed": seed}
+        cfg.update(d)
+        points.append(cfg)
+    return points
+
+
+def point_key(cfg):
+    """Stable id for one grid point; used as the resume key in the results table."""
+    return "{mode}|p{producers}|c{consumers}|cap{capacity}|b{batch_size}|d{prod_delay_ms:g}/{cons_delay_ms:g}/{prod_jitter_ms:g}/{cons_jitter_ms:g}|s{seed}".format(**cfg)
+
+
+def run_point(cfg, duration=None, max_items=None, virtual=False):
+    """Run one grid point headless and return its result row (runs in a worker process)."""
+    cls = VirtualEngine if virtual else SimulationEngine
+    engine = cls(
+        mode=cfg["mode"],
+        producers=cfg["producers"],
+        consumers=cfg["consumers"],
+        capacity=cfg["capacity"],
+        prod_delay_ms=cfg["prod_delay_ms"],
+        cons_delay_ms=cfg["cons_delay_ms"],
+        batch_size=cfg["batch_size"],
+        prod_jitter=cfg["prod_jitter_ms"] / 1000.0,
+        cons_jitter=cfg["cons_jitter_ms"] / 1000.0,
+        seed=cfg["seed"],
+        spsc_fast_path=False,   # the grid names its modes explicitly
+    )
+    row = {"point": point_key(cfg)}
+    row.update(engine.run(duration=duration, max_items=max_items))
+    return row
+
+
+def completed_points(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return set()
+    with open(path, newline="") as f:
+        return {row["point"] for row in csv.DictReader(f) if row.get("point")}
+
+
+def run_sweep(points, output, duration=None, max_items=None, virtual=False, workers=None,
+              on_result=None, on_error=None):
+    """Run every point not yet in `output`, appending rows as they complete.
+
+    Returns (ran, skipped, failed). `on_result(row, done, total)` is called
+    in the parent process after each row is written. A point that raises
+    is reported through `on_error(point_key, exc)` and left out of the
+    table (so a rerun retries it); the other points keep running.
+    """
+    done_keys = completed_points(output)
+    todo = [cfg for cfg in points if point_key(cfg) not in done_keys]
+    skipped = len(points) - len(todo)
+    if not todo:
+        return 0, skipped, 0
+
+    header = not os.path.exists(output) or os.path.getsize(output) == 0
+    fieldnames = None
+    if not header:
+        with open(output, newline="") as f:
+            fieldnames = next(csv.reader(f))
+
+    ran = failed = 0
+    with open(output, "a", newline="") as f, ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(run_point, cfg, duration, max_items, virtual): cfg for cfg in todo}
+        try:
+            for fut in as_completed(futures):
+                try:
+                    row = fut.result()
+                except Exception as e:
+                    failed += 1
+                    if on_error:
+                        on_error(point_key(futures[fut]), e)
+                    continue
+                if fieldnames is None:
+                    fieldnames = list(row)
+                writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore", lineterminator="\n")
+                if header:
+                    writer.writeheader()
+                    header = False
+                writer.writerow(row)
+                f.flush()
+                ran += 1
+                if on_result:
+                    on_result(row, ran, len(todo))
+        except KeyboardInterrupt:
+            # rows already written stay in the table; rerun the same sweep to resume
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    return ran, skipped, failed
@@ -0,0 +1,16 @@
+import pytest
+
+from aio import ASYNC_BUFFER_MODELS, AsyncEngine
+
+
+@pytest.mark.parametrize("mode", sorted(ASYNC_BUFFER_MODELS))
+def test_async_engine_moves_every_item(mode):
+    engine = AsyncEngine(mode=mode, producers=20, consumers=20, capacity=8,
+                         prod_delay_ms=0, cons_delay_ms=0, prod_jitter=0, cons_jitter=0)
+    res = engine.run(max_items=500)
+    assert res["produced"] == res["consumed"] == 500
+
+
+def test_async_engine_rejects_unmodelled_modes():
+    with pytest.raises(ValueError):
+        AsyncEngine(mode="SPSC").run(max_items=1)
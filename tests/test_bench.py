@@ -0,0 +1,44 @@
+from benchmarks.bench_buffers import compare, machine_info, machine_mismatch, main
+
+
+def test_same_machine_has_no_mismatch():
+    assert machine_mismatch(machine_info(), {"machine": machine_info()}) == []
+
+
+def test_mismatch_names_the_differing_fields():
+    other = dict(machine_info(), cpu_count=(machine_info()["cpu_count"] or 0) + 7, gil=not machine_info()["gil"])
+    assert [f for f, _, _ in machine_mismatch(machine_info(), {"machine": other})] == ["cpu_count", "gil"]
+
+
+def test_compare_flags_drops_beyond_tolerance():
+    base = {"results": [{"case": "a", "ops_per_s": 100.0}, {"case": "b", "ops_per_s": 100.0}]}
+    now = [{"case": "a", "ops_per_s": 95.0}, {"case": "b", "ops_per_s": 80.0}]
+    assert [r[0] for r in compare(now, base, 0.10)] == ["b"]
+
+
+def test_foreign_baseline_is_refused(tmp_path):
+    import json
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps({"machine": dict(machine_info(), system="elsewhere"), "results": []}))
+    argv = ["--modes", "Monitor", "--shapes", "1P1C", "--capacity", "4", "--items", "100", "--repeat", "1",
+            "-o", str(tmp_path / "bench.json"), "--baseline", str(path)]
+    assert main(argv) == 2
+    assert main(argv + ["--allow-machine-mismatch"]) == 0
+
+
+def test_kernel_and_patch_updates_keep_the_baseline():
+    other = dict(machine_info(), platform="Linux-9.9.9-patched", python="3.99.99")
+    assert machine_mismatch(machine_info(), {"machine": other}) == []
+
+
+def test_scaling_ratio_against_first_interpreter():
+    from benchmarks.bench_scaling import add_cross_ratios, speedup_table
+    def report(python, gil, ops):
+        return {"python": python, "machine": {"gil": gil},
+                "results": [{"mode": "Monitor", "threads": n, "ops_per_s": v, "speedup": v / ops[0]} for n, v in zip((1, 4), ops)]}
+    reports = [report("py-gil", True, [100.0, 80.0]), report("py-nogil", False, [90.0, 240.0])]
+    add_cross_ratios(reports)
+    assert [x["vs_first"] for x in reports[1]["results"]] == [0.9, 3.0]
+    table = speedup_table(reports)
+    assert "py-nogil (no-GIL) / py-gil (GIL)" in table
+    assert table.splitlines()[-1].rstrip().endswith("3.00x")
@@ -0,0 +1,151 @@
+import multiprocessing, threading
+
+import pytest
+
+from buffers import RingBuffer, SemaphoreBuffer, WorkStealingBuffer, acquire_many
+
+
+def test_ring_buffer_wraps_in_fifo_order():
+    ring = RingBuffer(3)
+    for i in range(3):
+        ring.append(i)
+    assert ring.popleft() == 0
+    ring.append(3)
+    assert [ring.popleft() for _ in range(len(ring))] == [1, 2, 3]
+    assert ring.slots == [None, None, None]
+
+
+def test_ring_buffer_bounds():
+    ring = RingBuffer(1)
+    with pytest.raises(IndexError):
+        ring.popleft()
+    ring.append("x")
+    with pytest.raises(IndexError):
+        ring.append("y")
+
+
+class StopOnGrab:
+    """Semaphore wrapper that calls stop() just before the first non-blocking acquire."""
+    def __init__(self, sem, buf):
+        self.sem = sem
+        self.buf = buf
+        self.fired = False
+
+    def acquire(self, blocking=True, timeout=None):
+        if not blocking and not self.fired:
+            self.fired = True
+            self.buf.stop()
+        if not blocking:
+            return self.sem.acquire(blocking=False)
+        return self.sem.acquire(timeout=timeout)
+
+    def release(self, n=1):
+        self.sem.release(n)
+
+
+def run_with_timeout(fn, timeout=2.0):
+    out = []
+    t = threading.Thread(target=lambda: out.append(fn()), daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "call deadlocked"
+    return out[0]
+
+
+def test_semaphore_produce_many_stop_mid_grab():
+    buf = SemaphoreBuffer(4)
+    buf.empty = StopOnGrab(buf.empty, buf)
+    assert run_with_timeout(lambda: buf.produce_many(list(range(8))))[0] == 0
+    assert len(buf) == 0
+
+
+def test_semaphore_consume_many_stop_mid_grab():
+    buf = SemaphoreBuffer(4)
+    assert buf.produce_many([1, 2])[0] == 2
+    buf.full = StopOnGrab(buf.full, buf)
+    assert run_with_timeout(lambda: buf.consume_many(8))[0] == []
+    assert len(buf) == 2
+
+
+def test_work_stealing_produce_many_stop_mid_grab():
+    buf = WorkStealingBuffer(4)
+    buf.empty = StopOnGrab(buf.empty, buf)
+    assert run_with_timeout(lambda: buf.produce_many(list(range(8))))[0] == 0
+    assert len(buf) == 0
+
+
+@pytest.mark.parametrize("mode", ["Semaphore", "WorkStealing"])
+def test_blocked_batch_producer_wakes_on_stop(mode):
+    from buffers import make_buffer
+    buf = make_buffer(mode, 2)
+    assert buf.produce_many([1, 2])[0] == 2
+    t = threading.Thread(target=lambda: buf.produce_many([3, 4]), daemon=True)
+    t.start()
+    buf.stop()
+    t.join(2.0)
+    assert not t.is_alive()
+
+
+@pytest.mark.parametrize("mode", ["Monitor", "Semaphore", "SPSC", "Sharded", "WorkStealing"])
+def test_batched_calls_report_occupancy(mode):
+    from buffers import make_buffer
+    buf = make_buffer(mode, 8)
+    assert buf.produce_many([1, 2, 3]) == (3, 3)
+    items, depth = buf.consume_many(2)
+    assert len(items) == 2 and depth == 1
+    assert len(buf) == 1
+
+
+@pytest.mark.parametrize("mode,prim", [("Monitor", "lock"), ("Semaphore", "mutex")])
+def test_occupancy_and_len_take_no_extra_acquire(mode, prim):
+    from buffers import make_buffer
+    from instrument import LockMetrics
+    metrics = LockMetrics()
+    buf = make_buffer(mode, 8, metrics=metrics)
+    buf.produce_many([1, 2, 3])
+    buf.consume_many(2)
+    len(buf)
+    assert metrics.totals()[f"{prim}_acquires"] == 2
+
+
+@pytest.mark.parametrize("gil", [True, False])
+def test_spsc_handoff_with_and_without_gil_ordering(monkeypatch, gil):
+    import buffers
+    monkeypatch.setattr(buffers, "GIL_ENABLED", gil)
+    buf = buffers.SPSCBuffer(2)
+    got = []
+
+    def consume():
+        while True:
+            item = buf.consume()
+            if item is None:
+                return
+            got.append(item)
+
+    t = threading.Thread(target=consume, daemon=True)
+    t.start()
+    for i in range(1, 2001):
+        assert buf.produce(i)
+    buf.produce(None)
+    t.join(5)
+    assert not t.is_alive()
+    assert got == list(range(1, 2001))
+
+
+def free_permits(sem):
+    n = 0
+    while sem.acquire(False):
+        n += 1
+    return n
+
+
+@pytest.mark.parametrize("make", [threading.Semaphore, multiprocessing.Semaphore])
+def test_acquire_many_grabs_free_permits_and_returns_them_on_stop(make):
+    sem = make(5)
+    assert acquire_many(sem, 3, lambda: False) == 3
+    assert free_permits(sem) == 2
+    sem = make(5)
+    checks = iter([False, True])    # stop() lands between the blocking acquire and the grab
+    assert acquire_many(sem, 3, lambda: next(checks)) == 0
+    assert free_permits(sem) == 5
+    assert acquire_many(make(0), 3, lambda: False, timeout=0.01) == 0
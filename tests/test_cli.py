@@ -0,0 +1,39 @@
+import pytest
+
+import cli
+
+
+@pytest.mark.parametrize("argv", [
+    ["run", "-p", "0", "-c", "1", "--items", "10"],
+    ["run", "-p", "1", "-c", "0", "--items", "10"],
+    ["run", "--capacity", "0", "--items", "10"],
+    ["pipeline", "--capacity", "0", "--items", "10"],
+    ["run", "--items", "0"],
+    ["run", "--items", "-5"],
+    ["pipeline", "--items", "0"],
+    ["sweep", "--items", "0", "-o", "unused.csv"],
+])
+def test_counts_below_one_are_rejected(argv):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(argv)
+    assert exc.value.code == 2
+
+
+def test_sweep_rejects_zero_in_a_range(tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["sweep", "-p", "0-2", "--items", "10", "-o", str(tmp_path / "s.csv")])
+    assert "at least 1" in str(exc.value.code)
+
+
+def test_appended_csv_rows_keep_the_table_columns(tmp_path):
+    import csv
+    out = str(tmp_path / "runs.csv")
+    quick = ["--items", "50", "--prod-delay", "0", "--cons-delay", "0", "--prod-jitter", "0", "--cons-jitter", "0",
+             "--format", "csv", "-o", out]
+    assert cli.main(["run", "--mode", "Monitor"] + quick) == 0
+    assert cli.main(["run", "--mode", "WorkStealing"] + quick) == 0
+    assert cli.main(["run", "--mode", "Semaphore", "--instrument"] + quick) == 0
+    with open(out, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["mode"] for r in rows] == ["Monitor", "WorkStealing", "Semaphore"]
+    assert all(None not in r for r in rows)     # no values beyond the header
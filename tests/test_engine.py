@@ -0,0 +1,48 @@
+import pytest
+
+from buffers import BUFFER_MODELS, SINGLE_PAIR_MODELS
+from engine import SimulationEngine
+from stats import ShardedHistogram
+
+
+def quick_engine(**kwargs):
+    kwargs.setdefault("prod_delay_ms", 0)
+    kwargs.setdefault("cons_delay_ms", 0)
+    return SimulationEngine(prod_jitter=0, cons_jitter=0, **kwargs)
+
+
+def test_waits_are_histograms():
+    engine = quick_engine(mode="Semaphore", producers=2, consumers=2, capacity=4)
+    res = engine.run(max_items=300)
+    assert all(isinstance(h, ShardedHistogram) for h in engine.waits.values())
+    assert engine.waits["consume"].merged().total >= res["consumed"]
+    assert engine.latency.merged().total == res["consumed"]
+    for op in ("produce", "consume"):
+        assert 0 <= res[f"{op}_wait_p50_ms"] <= res[f"{op}_wait_p90_ms"] <= res[f"{op}_wait_p99_ms"]
+        assert res[f"{op}_blocked_s"] >= 0
+
+
+@pytest.mark.parametrize("mode", list(BUFFER_MODELS))
+def test_every_item_is_consumed_once(mode):
+    pairs = 1 if mode in SINGLE_PAIR_MODELS else 3
+    engine = quick_engine(mode=mode, producers=pairs, consumers=pairs, capacity=4, batch_size=2, spsc_fast_path=False)
+    res = engine.run(max_items=400)
+    assert res["mode"] == mode
+    assert res["produced"] == res["consumed"] == 400
+    assert 0 < res["peak_buffer"] <= 4
+    assert all(state == "Stopped" for state in engine.thread_states.values())
+
+
+
+def test_latency_counts_every_consumed_item():
+    engine = quick_engine(mode="Monitor", producers=2, consumers=2, capacity=4, batch_size=3)
+    res = engine.run(max_items=300)
+    assert engine.latency.merged().total == res["consumed"]
+    assert 0 <= res["latency_p50_ms"] <= res["latency_p99_ms"] <= res["latency_max_ms"]
+
+
+def test_max_items_countdown_stops_exactly_once():
+    engine = quick_engine(mode="Semaphore", producers=4, consumers=4, capacity=4, batch_size=3)
+    res = engine.run(max_items=1000)
+    assert res["produced"] == res["consumed"] == 1000
+    assert engine._unconsumed == 0
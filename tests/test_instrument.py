@@ -0,0 +1,67 @@
+import threading
+import time
+
+from instrument import InstrumentedCondition, InstrumentedLock, InstrumentedSemaphore, LockMetrics
+
+
+def wait_until(check, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_notify_with_false_predicate_counts_as_spurious():
+    metrics = LockMetrics()
+    lock = InstrumentedLock("lock", metrics)
+    cond = InstrumentedCondition(lock, "not_empty", metrics)
+    ready = False
+    checks = []
+
+    def predicate():
+        checks.append(1)
+        return ready
+
+    def waiter():
+        with lock:
+            cond.wait_for(predicate)
+
+    t = threading.Thread(target=waiter)
+    t.start()
+    wait_until(lambda: len(checks) >= 1)
+    with lock:              # the waiter is parked once it released the lock
+        cond.notify()       # ... and wakes to a still-false predicate
+    wait_until(lambda: len(checks) >= 2)
+    with lock:
+        ready = True
+        cond.notify()
+    t.join(5)
+    stats = metrics.snapshot()["primitives"]["not_empty"]
+    assert (stats["waits"], stats["wakeups"], stats["spurious"]) == (2, 2, 1)
+
+
+def test_lock_records_contention_and_hold_time():
+    metrics = LockMetrics()
+    lock = InstrumentedLock("lock", metrics)
+    lock.acquire()
+    t = threading.Thread(target=lambda: (lock.acquire(), lock.release()))
+    t.start()
+    time.sleep(0.02)
+    lock.release()
+    t.join(5)
+    totals = metrics.totals()
+    assert totals["lock_acquires"] == 2
+    assert totals["lock_contended"] == 1
+    assert totals["lock_wait_ms"] > 0 and totals["lock_hold_ms"] > 0
+
+
+def test_semaphore_tracks_hold_only_when_asked():
+    metrics = LockMetrics()
+    mutex = InstrumentedSemaphore(1, "mutex", metrics, track_hold=True)
+    empty = InstrumentedSemaphore(1, "empty", metrics)
+    for sem in (mutex, empty):
+        with sem:
+            time.sleep(0.005)
+    prims = metrics.snapshot()["primitives"]
+    assert prims["mutex"]["hold_ms"] > 0
+    assert prims["empty"]["hold_ms"] == 0
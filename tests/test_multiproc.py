@@ -0,0 +1,38 @@
+import threading
+
+from multiproc import ProcessEngine
+
+
+def quick_engine(**kwargs):
+    return ProcessEngine(mode="Semaphore", prod_delay_ms=0, cons_delay_ms=0, prod_jitter=0, cons_jitter=0, **kwargs)
+
+
+def test_process_run_moves_every_item():
+    engine = quick_engine(producers=2, consumers=2, capacity=8)
+    res = engine.run(max_items=300)
+    assert res["produced"] == res["consumed"] == 300
+    assert 0 < res["peak_buffer"] <= 8
+
+
+def test_buffer_len_survives_shared_memory_close():
+    engine = quick_engine(producers=1, consumers=1, capacity=4)
+    finished = threading.Event()
+    engine.subscribe(lambda ev: finished.set() if ev[0] == "finished" else None)
+    lens = []
+    stop_polling = threading.Event()
+
+    def poll():     # what the GUI's after() loop does
+        while not stop_polling.is_set():
+            lens.append(engine.buffer_len())
+
+    engine.max_items = 200
+    assert engine.start()
+    poller = threading.Thread(target=poll)
+    poller.start()
+    assert finished.wait(60)
+    stop_polling.set()
+    poller.join()
+    assert engine.buffer_model.buf is None
+    assert engine.buffer_len() == engine.buffer_model.final_len
+    assert all(0 <= n <= 4 for n in lens)
+    assert not engine.stop()
@@ -0,0 +1,23 @@
+import pytest
+
+from pipeline import PipelineEngine, parse_stages
+
+
+def test_parse_stages_reads_optional_fields_in_any_order():
+    src, mid, sink = parse_stages("2:300, 4:450:8:exp:Semaphore ,1:100")
+    assert [s.name for s in (src, mid, sink)] == ["S1", "S2", "S3"]
+    assert (mid.workers, mid.service_ms, mid.dist, mid.mode, mid.capacity) == (4, 450.0, "exp", "Semaphore", 8)
+    assert mid.spec() == "4:450:exp:Semaphore:8"
+
+
+@pytest.mark.parametrize("text", ["1:1", "1", "x:1,1:1", "1:1:bogus,1:1", "0:1,1:1", "1:-1,1:1", "1:1:0,1:1"])
+def test_parse_stages_rejects_bad_specs(text):
+    with pytest.raises(ValueError):
+        parse_stages(text)
+
+
+def test_pipeline_finds_the_slow_stage():
+    engine = PipelineEngine(parse_stages("1:1:const,1:6:const,2:1:const"), seed=1)
+    res = engine.run(max_items=40)
+    assert res["bottleneck"] == "S2"
+    assert res["stages"][-1]["processed"] >= 40
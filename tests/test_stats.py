@@ -0,0 +1,70 @@
+import threading
+
+from stats import LatencyHistogram, ShardedCounter, ShardedHistogram, ShardedMax
+
+
+def test_histogram_percentiles_within_bucket_error():
+    hist = LatencyHistogram()
+    for v in range(1, 10001):
+        hist.record(v * 1000)
+    for q, exact in ((50, 5_000_000), (99, 9_900_000)):
+        assert abs(hist.value_at(q) - exact) / exact < 0.04
+    assert hist.value_at(100) == hist.max == 10_000_000
+    assert hist.total == 10000
+
+
+def test_histogram_small_values_are_exact():
+    hist = LatencyHistogram()
+    for v in (0, 1, 5, 63):
+        hist.record(v)
+    assert [hist.value_at(q) for q in (25, 50, 75, 100)] == [0, 1, 5, 63]
+
+
+def test_histogram_merge_adds_counts():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(10)
+    b.record(1000)
+    b.record(2000)
+    a.merge(b)
+    assert (a.total, a.sum, a.max) == (3, 3010, 2000)
+    assert sum(a.log2_counts(0, 20)) == 3
+
+
+def test_empty_histogram_snapshot():
+    snap = LatencyHistogram().snapshot()
+    assert snap["count"] == 0 and snap["p99"] == 0.0 and snap["mean"] == 0.0
+
+
+def test_sharded_counter_and_max_across_threads():
+    count, peak = ShardedCounter(), ShardedMax()
+
+    def work(k):
+        for i in range(1000):
+            count.add()
+            peak.update(k * 1000 + i)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert count.value() == 4000
+    assert peak.value() == 3999
+
+
+def test_sharded_histogram_merges_per_thread_cells():
+    hist = ShardedHistogram()
+
+    def work(k):
+        for i in range(100):
+            hist.record(k * 100 + i)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    merged = hist.merged()
+    assert len(hist.cells) == 4
+    assert (merged.total, merged.max) == (400, 399)
+    assert hist.value_at(100) == 399
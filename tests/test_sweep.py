@@ -0,0 +1,49 @@
+import csv
+
+import pytest
+
+from sweep import expand_grid, parse_delay_profile, parse_int_list, point_key, run_sweep
+
+DELAYS = [parse_delay_profile("1/1")]
+
+
+def rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_parse_int_list_mixes_ranges_and_values():
+    assert parse_int_list("1-4,16, 2,") == [1, 2, 3, 4, 16]
+
+
+def test_parse_delay_profile_rejects_three_fields():
+    with pytest.raises(ValueError):
+        parse_delay_profile("1/2/3")
+
+
+def test_expand_grid_keeps_only_1p1c_for_single_pair_modes():
+    points = expand_grid(["Monitor", "SPSC"], [1, 2], [1, 2], [4], DELAYS)
+    assert sum(p["mode"] == "Monitor" for p in points) == 4
+    assert [(p["producers"], p["consumers"]) for p in points if p["mode"] == "SPSC"] == [(1, 1)]
+
+
+def test_rerun_skips_points_already_in_the_table(tmp_path):
+    out = str(tmp_path / "sweep.csv")
+    points = expand_grid(["Monitor", "Semaphore"], [1, 2], [1], [4], DELAYS, seed=3)
+    assert run_sweep(points[:2], out, max_items=20, virtual=True, workers=1) == (2, 0, 0)
+    assert run_sweep(points, out, max_items=20, virtual=True, workers=1) == (2, 2, 0)
+    assert run_sweep(points, out, max_items=20, virtual=True, workers=1) == (0, 4, 0)
+    table = rows(out)
+    assert sorted(r["point"] for r in table) == sorted(map(point_key, points))
+    assert all(r["consumed"] == "20" for r in table)
+
+
+def test_failed_points_are_reported_and_left_for_the_rerun(tmp_path):
+    out = str(tmp_path / "sweep.csv")
+    points = expand_grid(["Monitor", "SPSC"], [1], [1], [4], DELAYS)
+    errors = []
+    ran, skipped, failed = run_sweep(points, out, max_items=20, virtual=True, workers=1,
+                                     on_error=lambda key, exc: errors.append(key))
+    assert (ran, skipped, failed) == (1, 0, 1)
+    assert errors == [point_key(points[1])]
+    assert [r["point"] for r in rows(out)] == [point_key(points[0])]
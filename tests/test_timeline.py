@@ -0,0 +1,49 @@
+import pytest
+
+from engine import SimulationEngine
+from timeline import Timeline, TimelineTrack, read_spill
+
+STATES = ["Ready", "Running", "Waiting", "Stopped"]
+
+
+def test_track_keeps_only_the_newest_events():
+    tr = TimelineTrack(capacity=3)
+    for i in range(10):
+        tr.append(STATES[i % 4], float(i))
+    assert (len(tr), tr.total) == (3, 10)
+    assert list(tr) == [("Stopped", 7.0), ("Ready", 8.0), ("Running", 9.0)]
+    codes, times = tr.last(2)
+    assert list(codes) == [0, 1] and list(times) == [8.0, 9.0]
+
+
+def test_partly_filled_track_and_oversized_last():
+    tr = TimelineTrack(capacity=4)
+    tr.append("Running", 1.0)
+    assert list(tr) == [("Running", 1.0)]
+    assert [len(col) for col in tr.last(100)] == [1, 1]
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        TimelineTrack(capacity=0)
+
+
+def test_spill_keeps_the_full_history(tmp_path):
+    tl = Timeline(capacity=2, spill_dir=str(tmp_path))
+    events = [(STATES[i % 4], i / 10) for i in range(50)]
+    for state, ts in events:
+        tl.record("P1", state, ts)
+    tl.close()
+    assert len(tl["P1"]) == 2
+    assert list(read_spill(str(tmp_path / "P1.tl"))) == events
+
+
+def test_engine_spills_every_thread(tmp_path):
+    engine = SimulationEngine(producers=2, consumers=1, prod_delay_ms=0, cons_delay_ms=0, prod_jitter=0,
+                              cons_jitter=0, timeline_capacity=4, timeline_spill=str(tmp_path))
+    engine.run(max_items=30)
+    for name in ("P1", "P2", "C1"):
+        spilled = list(read_spill(str(tmp_path / f"{name}.tl")))
+        track = engine.timeline_data[name]
+        assert len(spilled) == track.total > len(track) == 4
+        assert spilled[-4:] == list(track)
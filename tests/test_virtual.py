@@ -0,0 +1,54 @@
+import pytest
+
+from virtual import VIRTUAL_BUFFER_MODELS, VirtualEngine
+
+
+@pytest.mark.parametrize("mode", ["Sharded", "WorkStealing", "SPSC"])
+def test_unmodelled_modes_are_rejected(mode):
+    engine = VirtualEngine(mode=mode, producers=1, consumers=1)
+    with pytest.raises(ValueError):
+        engine.run(duration=1.0)
+
+
+@pytest.mark.parametrize("mode", VIRTUAL_BUFFER_MODELS)
+def test_one_pair_keeps_requested_mode(mode):
+    engine = VirtualEngine(mode=mode, producers=1, consumers=1, prod_delay_ms=10, cons_delay_ms=10,
+                           prod_jitter=0, cons_jitter=0, seed=1)
+    res = engine.run(max_items=20)
+    assert engine.buffer_mode == mode
+    assert res["consumed"] >= 20
+
+
+def test_start_runs_in_background_until_max_items():
+    import threading
+    engine = VirtualEngine(mode="Semaphore", producers=2, consumers=2, prod_delay_ms=10, cons_delay_ms=10,
+                           prod_jitter=0, cons_jitter=0, seed=1)
+    engine.max_items = 200
+    finished = threading.Event()
+    engine.subscribe(lambda ev: finished.set() if ev[0] == "finished" else None)
+    assert engine.start()
+    assert finished.wait(5)
+    assert engine.join(5)
+    assert not engine.running
+    assert engine.results()["consumed"] >= 200
+
+
+def test_stop_ends_a_background_run():
+    engine = VirtualEngine(mode="Monitor", producers=1, consumers=1, prod_delay_ms=10, cons_delay_ms=10, seed=1)
+    assert engine.start()
+    assert engine.stop()
+    assert engine.join(5)
+    assert not engine.stop()
+    assert engine.results()["clock"] == "virtual"
+
+
+def test_zero_think_time_is_rejected():
+    engine = VirtualEngine(mode="Monitor", prod_delay_ms=0, cons_delay_ms=0, prod_jitter=0, cons_jitter=0)
+    with pytest.raises(ValueError):
+        engine.run(duration=10)
+
+
+def test_one_sided_think_time_still_advances_the_clock():
+    engine = VirtualEngine(mode="Monitor", prod_delay_ms=0, cons_delay_ms=5, prod_jitter=0, cons_jitter=0, seed=1)
+    res = engine.run(duration=1.0)
+    assert res["elapsed_s"] == 1.0 and res["throughput"] > 0
@@ -0,0 +1,114 @@
+# timeline.py
+"""
+Bounded, columnar storage for per-thread state timelines.
+- TimelineTrack: fixed-capacity ring of state codes (array('B')) and
+  timestamps (array('d')); the newest events are one zero-copy slice
+- Timeline: name -> TimelineTrack mapping used as engine.timeline_data
+- Optional spill-to-disk tier keeps the full history as packed records
+"""
+
+import os, struct, threading
+from array import array
+
+STATES = ("Ready", "Running", "Waiting", "Stopped")
+STATE_CODES = {s: i for i, s in enumerate(STATES)}
+
+# one spilled event: state code + timestamp
+RECORD = struct.Struct("<Bd")
+
+DEFAULT_CAPACITY = 256
+
+
+class TimelineTrack:
+    """Last `capacity` (state, timestamp) events of one thread, stored columnar.
+
+    Both columns are 2*capacity long and every event is written at i and
+    i+capacity, so the newest events always form one contiguous run and
+    last(n) hands out memoryview slices without copying. Memory is fixed
+    at construction. `total` counts every event ever appended.
+    Each track has a single writer (its worker thread). `total` is bumped
+    only after both columns are written, so a reader on another thread
+    (the GUI) never sees a half-written newest event; only the oldest
+    slots of a full ring may be overwritten while it reads them.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill=None):
+        if capacity < 1:
+            raise ValueError("timeline capacity must be at least 1")
+        self.capacity = capacity
+        self.codes = array("B", bytes(2 * capacity))
+        self.times = array("d", bytes(16 * capacity))
+        self.total = 0
+        self.spill = spill      # binary file receiving every event, or None
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, state, ts):
+        code = STATE_CODES[state]
+        cap = self.capacity
+        i = self.total % cap
+        self.codes[i] = self.codes[i + cap] = code
+        self.times[i] = self.times[i + cap] = ts
+        if self.spill is not None:
+            self.spill.write(RECORD.pack(code, ts))
+        self.total += 1
+
+    def last(self, n):
+        """(codes, times) memoryviews over the newest min(n, len) events, oldest first."""
+        total = self.total      # read once: the writer may append meanwhile
+        n = min(n, total, self.capacity)
+        end = total % self.capacity + self.capacity
+        return memoryview(self.codes)[end - n:end], memoryview(self.times)[end - n:end]
+
+    def __iter__(self):
+        codes, times = self.last(self.capacity)
+        for code, ts in zip(codes, times):
+            yield STATES[code], ts
+
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+
+class Timeline(dict):
+    """Thread name -> TimelineTrack, created on first record().
+
+    With `spill_dir`, each track also appends its full history to
+    `<spill_dir>/<name>.tl`; read it back with read_spill().
+    Engines create every track before starting workers; creation is still
+    locked so a late first record() cannot race another thread's.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill_dir=None):
+        super().__init__()
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.lock = threading.Lock()
+
+    def track(self, name):
+        tr = self.get(name)
+        if tr is None:
+            with self.lock:
+                tr = self.get(name)
+                if tr is None:
+                    spill = None
+                    if self.spill_dir is not None:
+                        os.makedirs(self.spill_dir, exist_ok=True)
+                        spill = open(os.path.join(self.spill_dir, f"{name}.tl"), "wb")
+                    tr = self[name] = TimelineTrack(self.capacity, spill)
+        return tr
+
+    def record(self, name, state, ts):
+        self.track(name).append(state, ts)
+
+    def close(self):
+        for tr in self.values():
+            tr.close()
+
+
+def read_spill(path):
+    """Yield the (state, timestamp) events of a spilled track file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    for code, ts in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+        yield STATES[code], ts
@@ -0,0 +1,234 @@
+# virtual.py
+"""
+Discrete-event (virtual time) version of the simulation engine.
+- Same Monitor/Semaphore blocking rules as the threaded buffers
+- A priority-queue scheduler advances a virtual clock instead of sleeping
+- Publishes the same events and timeline_data (state, timestamp) events,
+  with timestamps in virtual seconds from the start of the run
+"""
+
+import heapq, itertools, threading, time
+from collections import deque
+
+from buffers import RingBuffer
+from engine import SimulationEngine
+
+# Modes whose blocking rules the scheduler models (a single FIFO ring)
+VIRTUAL_BUFFER_MODELS = ("Monitor", "Semaphore")
+
+
+def check_think_times(prod_s, cons_s):
+    """Reject virtual runs where no actor ever spends time (delay + jitter).
+
+    Only think time advances the virtual clock: with both sides at zero it
+    stays at 0, so a duration never runs out and throughput reads 0.
+    """
+    if prod_s <= 0 and cons_s <= 0:
+        raise ValueError("virtual runs need a producer or consumer delay/jitter above 0; "
+                         "with zero think time the virtual clock never advances")
+
+
+class VirtualEngine(SimulationEngine):
+    """Runs the producer/consumer model over virtual time on one thread.
+
+    Every mode blocks the same way their threaded counterparts do: an
+    operation that cannot proceed parks the actor, and every item moved
+    wakes up to that many parked actors on the other side (notify(n) for
+    Monitor, release(n) for Semaphore). A woken actor that finds nothing
+    to do parks again. An hour of simulated time takes well under a
+    second because nothing actually sleeps.
+
+    run() simulates on the calling thread; start() runs the same loop on
+    one background thread until stop() or max_items, for callers that
+    subscribe to events and join() like the threaded engine.
+    """
+    now = 0.0
+    wall_s = 0.0
+
+    def clock(self):
+        return self.now
+
+    def resolve_mode(self):
+        # Sharded, work-stealing and SPSC layouts are not modelled; running
+        # them as a plain FIFO would report results under the wrong name.
+        if self.mode not in VIRTUAL_BUFFER_MODELS:
+            raise ValueError(f"virtual runs support {', '.join(VIRTUAL_BUFFER_MODELS)}, not {self.mode!r}")
+        return self.mode
+
+    def start(self):
+        if self.running:
+            return False
+        self.prepare()
+        t = threading.Thread(target=self.simulate, name="virtual-engine", daemon=True)
+        self.threads = [t]
+        t.start()
+        return True
+
+    def stop(self):
+        # the scheduler loop checks stop_event between events
+        return self.begin_stop()
+
+    def buffer_len(self):
+        return len(self.q)
+
+    # -------------------------
+    # Scheduler
+    # -------------------------
+    def schedule(self, at, fn, name):
+        heapq.heappush(self._heap, (at, next(self._seq), fn, name))
+
+    def run(self, duration=None, max_items=None):
+        """Simulate `duration` virtual seconds, or until `max_items` are consumed."""
+        if duration is None and max_items is None and self.max_items is None:
+            raise ValueError("virtual runs need a duration or max_items")
+        if self.running:
+            raise RuntimeError("engine is already running")
+        if max_items is not None:
+            self.max_items = max_items
+        self.prepare()
+        self.simulate(duration)
+        self.finish_run()
+        return self.results()
+
+    def prepare(self):
+        mode = self.resolve_mode()
+        if self.replay_delays is None:
+            check_think_times(self.prod_delay_ms / 1000.0 + self.prod_jitter,
+                              self.cons_delay_ms / 1000.0 + self.cons_jitter)
+        self.running = True
+        self.stop_event.clear()
+        self.reset()
+        self.buffer_mode = mode
+        self.delays = self.make_schedule()
+        self.think_streams = {name: self.delays.stream(name) for name in self.thread_names()}
+        self.q = RingBuffer(self.capacity)
+        self.now = 0.0
+        self._heap = []
+        self._seq = itertools.count()
+        self.waiting = {"P": deque(), "C": deque()}
+        self.pending = {}       # producer name -> labels not yet in the buffer
+        self.next_id = {}       # producer name -> next item number
+        self.desc = {}          # producer name -> label(s) of the batch in flight
+        self.since = {}         # actor name -> virtual time it started waiting
+
+    def simulate(self, duration=None):
+        """Advance the clock until `duration` virtual seconds, max_items or stop()."""
+        wall0 = time.perf_counter()
+        self.started_at = 0.0
+        for i in range(self.producers):
+            name = f"P{i+1}"
+            self.next_id[name] = 1
+            self.thread_state_change(name, "Running")
+            self.schedule(self.think(name), self.producer_attempt, name)
+        for j in range(self.consumers):
+            name = f"C{j+1}"
+            self.thread_state_change(name, "Running")
+            self.schedule(self.think(name), self.consumer_attempt, name)
+
+        while self._heap and not self.stop_event.is_set():
+            at, _, fn, name = heapq.heappop(self._heap)
+            if duration is not None and at > duration:
+                self.now = duration
+                break
+            self.now = at
+            fn(name)
+
+        self.begin_stop()
+        self.stopped_at = self.now
+        for name in self.thread_names():
+            if self.thread_states.get(name) != "Stopped":
+                self.thread_state_change(name, "Stopped")
+            self.emit("log", "S", f"{name} stopped")
+        self.wall_s = time.perf_counter() - wall0
+        self.emit("finished")
+
+    def results(self):
+        res = super().results()
+        res["clock"] = "virtual"
+        res["wall_s"] = round(self.wall_s, 6)
+        return res
+
+    def think(self, name):
+        batch = max(1, self.batch_size)
+        if name[0] == "P":
+            return self.now + self.think_streams[name].next(self.prod_delay_ms/1000.0, self.prod_jitter, batch)
+        return self.now + self.think_streams[name].next(self.cons_delay_ms/1000.0, self.cons_jitter, batch)
+
+    def wake(self, role, n):
+        # notify(n) / release(n): up to n parked actors retry at the current instant
+        parked = self.waiting[role]
+        retry = self.retry_produce if role == "P" else self.retry_consume
+        for _ in range(min(n, len(parked))):
+            self.schedule(self.now, retry, parked.popleft())
+
+    # -------------------------
+    # Producer / Consumer actors
+    # -------------------------
+    def producer_attempt(self, name):
+        batch = self.claim_items(max(1, self.batch_size))
+        if batch == 0:
+            self.thread_state_change(name, "Stopped")     # every item is claimed
+            return
+        first = self.next_id[name]
+        self.next_id[name] = first + batch
+        self.pending[name] = [f"{name}-{first + k}" for k in range(batch)]
+        self.desc[name] = f"{name}-{first}" if batch == 1 else f"{name}-{first}..{name}-{first + batch - 1}"
+        if self.subscribers:
+            self.emit("log", "P", f"{name} trying to produce {self.desc[name]}")
+        self.thread_state_change(name, "Waiting")
+        self.since[name] = self.now
+        self.retry_produce(name)
+
+    def retry_produce(self, name):
+        labels = self.pending[name]
+        free = self.capacity - len(self.q)
+        if free == 0:
+            self.waiting["P"].append(name)
+            return
+        n = min(free, len(labels))
+        enq_ns = int(self.now * 1e9)
+        for i in range(n):
+            self.q.append((labels[i], enq_ns))
+        self.pending[name] = labels = labels[n:]
+        self.produced.add(n)
+        self.peak.update(len(self.q))
+        self.emit("slot_update", len(self.q))
+        self.wake("C", n)
+        if labels:
+            self.waiting["P"].append(name)
+            return
+
+        self.record_wait("produce", self.now - self.since[name])
+        if self.subscribers:
+            self.emit("log", "P", f"{name} produced {self.desc[name]}")
+        self.thread_state_change(name, "Running")
+        self.schedule(self.think(name), self.producer_attempt, name)
+
+    def consumer_attempt(self, name):
+        if self.subscribers:
+            self.emit("log", "C", f"{name} trying to consume")
+        self.thread_state_change(name, "Waiting")
+        self.since[name] = self.now
+        self.retry_consume(name)
+
+    def retry_consume(self, name):
+        if len(self.q) == 0:
+            self.waiting["C"].append(name)
+            return
+        n = min(max(1, self.batch_size), len(self.q))
+        items = [self.q.popleft() for _ in range(n)]
+        now_ns = int(self.now * 1e9)
+        for _, enq_ns in items:
+            self.latency.record(now_ns - enq_ns)
+        done = self.count_consumed(n)
+        self.emit("slot_update", len(self.q))
+        self.wake("P", n)
+
+        self.record_wait("consume", self.now - self.since[name])
+        if self.subscribers:
+            self.emit("log", "C", f"{name} consumed {items[0][0]}" if n == 1 else f"{name} consumed {items[0][0]}..{items[-1][0]} ({n} items)")
+        self.thread_state_change(name, "Running")
+        if done:
+            self.stop()
+            return
+        self.schedule(self.think(name), self.consumer_attempt, name)